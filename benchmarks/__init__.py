@@ -0,0 +1 @@
+"""Benchmarks for the Cupra Formentor integration."""
@@ -0,0 +1,192 @@
+"""Offline stand-in for the WeConnect client used by the benchmarks.
+
+Mimics the parts of weconnect.weconnect.WeConnect the integration touches:
+login, update (with selective domains), persistTokens, the vehicles dict
+with their domains and controls, and the HTTP session hooks.
+"""
+from __future__ import annotations
+
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from weconnect.errors import APIError
+
+
+@dataclass
+class FakeBackendConfig:
+    """How the fake backend behaves."""
+
+    vehicles: int = 1
+    # Seconds each simulated HTTP request takes
+    latency: float = 0.0
+    # Probability that an update fails with an API error
+    failure_rate: float = 0.0
+    seed: int = 0
+
+
+class FakeAttribute:
+    """A WeConnect attribute: a value plus an enabled flag."""
+
+    def __init__(self, value: Any, enabled: bool = True) -> None:
+        self.value = value
+        self.enabled = enabled
+
+
+class FakeStatus:
+    """A WeConnect status object holding named attributes."""
+
+    def __init__(self, **values: Any) -> None:
+        for name, value in values.items():
+            setattr(self, name, FakeAttribute(value))
+
+
+@dataclass
+class FakeControls:
+    """Vehicle controls the commands write to."""
+
+    chargingControl: FakeAttribute = field(default_factory=lambda: FakeAttribute(None))
+    climatizationControl: FakeAttribute = field(
+        default_factory=lambda: FakeAttribute(None)
+    )
+
+
+class FakeVehicle:
+    """A vehicle with charging and climatisation domains."""
+
+    def __init__(self, index: int, rng: random.Random) -> None:
+        self._rng = rng
+        self.vin = FakeAttribute(f"VSSZZZKMZNR{index:06d}")
+        self.nickname = FakeAttribute(f"Formentor {index + 1}")
+        self.model = FakeAttribute("Formentor e-HYBRID")
+        self.status = FakeStatus(connectionState="online")
+        self.controls = FakeControls()
+        self.domains: dict[str, dict[str, FakeStatus]] = {
+            "charging": {
+                "batteryStatus": FakeStatus(
+                    currentSOC_pct=rng.randint(20, 90), cruisingRangeElectric_km=40
+                ),
+                "chargingStatus": FakeStatus(
+                    chargingState="charging" if index % 2 else "readyForCharging",
+                    chargeMode="manual",
+                    chargeType="ac",
+                    chargePower_kW=3.6 if index % 2 else 0.0,
+                ),
+                "plugStatus": FakeStatus(
+                    plugConnectionState="connected",
+                    plugLockState="locked",
+                    externalPower="active",
+                ),
+                "chargingSettings": FakeStatus(
+                    maxChargeCurrentAC="maximum", targetSOC_pct=80
+                ),
+            },
+            "climatisation": {
+                "climatisationStatus": FakeStatus(climatisationState="off"),
+                "climatisationSettings": FakeStatus(targetTemperature_C=21.0),
+            },
+        }
+
+    def tick(self) -> None:
+        """Advance the simulated state between two polls."""
+        battery = self.domains["charging"]["batteryStatus"]
+        charging = self.domains["charging"]["chargingStatus"]
+        if charging.chargingState.value == "charging":
+            soc = min(battery.currentSOC_pct.value + 1, 100)
+            battery.currentSOC_pct.value = soc
+            battery.cruisingRangeElectric_km.value = int(soc * 0.5)
+            charging.chargePower_kW.value = round(3.4 + self._rng.random() * 0.4, 1)
+
+
+class FakeResponse:
+    """Just enough of a requests response for the session hooks."""
+
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.headers: dict[str, str] = {}
+        self.content = b"{}"
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class FakeSession:
+    """Stand-in for the client's requests session."""
+
+    def __init__(self) -> None:
+        self.hooks: dict[str, list] = {"response": []}
+        self.token = {"access_token": None}
+
+
+class FakeWeConnect:
+    """Drop-in replacement for weconnect.weconnect.WeConnect."""
+
+    # Set by the benchmark before the integration creates a client
+    config = FakeBackendConfig()
+    # All clients created so far, so the benchmark can read their counters
+    instances: list[FakeWeConnect] = []
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        tokenfile: str | None = None,
+        updateAfterLogin: bool = True,
+        loginOnInit: bool = False,
+        timeout: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self._tokenfile = tokenfile
+        self._rng = random.Random(self.config.seed)
+        self.session = FakeSession()
+        self.vehicles: dict[str, FakeVehicle] = {}
+        self.requests = 0
+        self.logged_in = False
+        FakeWeConnect.instances.append(self)
+
+    def login(self) -> None:
+        """Simulate the OAuth login round trips."""
+        for _ in range(3):
+            self._request()
+        self.logged_in = True
+
+    def update(
+        self,
+        updateCapabilities: bool = True,
+        updatePictures: bool = True,
+        selective: list | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Simulate fetching the vehicle list and their selective status."""
+        if self._rng.random() < self.config.failure_rate:
+            self._request(503)
+            raise APIError("Simulated backend failure")
+
+        self._request()
+        if not self.vehicles:
+            for index in range(self.config.vehicles):
+                vehicle = FakeVehicle(index, self._rng)
+                self.vehicles[vehicle.vin.value] = vehicle
+
+        for vehicle in self.vehicles.values():
+            if updateCapabilities:
+                self._request()
+            self._request()
+            vehicle.tick()
+
+    def persistTokens(self) -> None:
+        """Write a fake token file like WeConnect does."""
+        if self._tokenfile:
+            with open(self._tokenfile, "w", encoding="utf8") as file:
+                json.dump({"fake": True, "issued": time.time()}, file)
+
+    def _request(self, status_code: int = 200) -> None:
+        """Spend the configured latency and run the session response hooks."""
+        self.requests += 1
+        if self.config.latency:
+            time.sleep(self.config.latency)
+        response = FakeResponse(status_code)
+        for hook in self.session.hooks.get("response", []):
+            hook(response)
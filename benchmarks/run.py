@@ -0,0 +1,205 @@
+"""Benchmark the Cupra Formentor integration against the fake backend.
+
+Run from the repository root:
+
+    python -m benchmarks.run --vehicles 3 --cycles 20 --output results.json
+
+Measures config entry setup time, update cycle latency, state writes per
+cycle and the cost of evaluating every entity's state, and prints the
+results as JSON so runs can be compared over time.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import loader
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import DATA_ENTITY_PLATFORM
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.cupra_formentor.const import (
+    CONF_ASYNC_CLIENT,
+    DOMAIN,
+)
+
+from .fake_weconnect import FakeBackendConfig, FakeWeConnect
+
+# Evaluations per entity when timing state reads
+STATE_READS = 1000
+
+
+def _percentile(values: list[float], percent: float) -> float | None:
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _entities(hass) -> list:
+    """Return all entity objects the integration created."""
+    return [
+        entity
+        for entity_platform in hass.data[DATA_ENTITY_PLATFORM].get(DOMAIN, [])
+        for entity in entity_platform.entities.values()
+    ]
+
+
+def _state_cost(hass) -> dict[str, dict[str, float]]:
+    """Time state evaluation per entity class, in microseconds per read."""
+    timings: dict[str, list[float]] = {}
+    for entity in _entities(hass):
+        start = time.perf_counter()
+        for _ in range(STATE_READS):
+            entity.state  # pylint: disable=pointless-statement
+        elapsed = (time.perf_counter() - start) / STATE_READS * 1e6
+        timings.setdefault(type(entity).__name__, []).append(elapsed)
+
+    return {
+        name: {
+            "entities": len(values),
+            "mean_us": round(statistics.fmean(values), 3),
+            "max_us": round(max(values), 3),
+        }
+        for name, values in sorted(timings.items())
+    }
+
+
+async def async_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    """Set up one account on the fake backend and run update cycles."""
+    FakeWeConnect.config = FakeBackendConfig(
+        vehicles=args.vehicles,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    FakeWeConnect.instances.clear()
+
+    entity_ids: set[str] = set()
+    state_writes: Counter[str] = Counter()
+    write_ha_state = Entity.async_write_ha_state
+
+    def _count_write(entity: Entity) -> None:
+        # Every write counts, also those HA drops because nothing changed
+        if entity.entity_id in entity_ids:
+            state_writes["cycle"] += 1
+        write_ha_state(entity)
+
+    with tempfile.TemporaryDirectory() as config_dir, patch(
+        "custom_components.cupra_formentor.client.WeConnect", FakeWeConnect
+    ), patch.multiple(
+        "custom_components.cupra_formentor.coordinator",
+        # The benchmark measures polling, not the request budget
+        REQUEST_BUDGET_CAPACITY=10**9,
+        REQUEST_BUDGET_PER_HOUR=10**9,
+        REQUEST_BUDGET_RESERVE=0,
+    ), patch.object(Entity, "async_write_ha_state", _count_write):
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            Path(hass.config.path(".storage")).mkdir(exist_ok=True)
+            # Load the integration from this checkout's custom_components
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                title="Benchmark",
+                data={"username": "bench@example.com", "password": "secret"},
+                options={CONF_ASYNC_CLIENT: False},
+            )
+            entry.add_to_hass(hass)
+
+            start = time.perf_counter()
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            setup_seconds = time.perf_counter() - start
+
+            coordinator = hass.data[DOMAIN][entry.entry_id + "_coordinator"]
+            entity_ids.update(entity.entity_id for entity in _entities(hass))
+
+            cycles = []
+            for _ in range(args.cycles):
+                state_writes.clear()
+                start = time.perf_counter()
+                await coordinator.async_refresh()
+                await hass.async_block_till_done()
+                changes = coordinator.last_changes
+                cycles.append(
+                    {
+                        "seconds": round(time.perf_counter() - start, 6),
+                        "state_writes": state_writes["cycle"],
+                        "changed_fields": changes.changed if changes else None,
+                        "unchanged_fields": changes.unchanged if changes else None,
+                        "breaker": coordinator.breaker.state,
+                    }
+                )
+
+            state_cost = _state_cost(hass)
+            requests = sum(client.requests for client in FakeWeConnect.instances)
+
+            assert await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+
+    latencies = [cycle["seconds"] for cycle in cycles]
+    writes = [cycle["state_writes"] for cycle in cycles]
+    return {
+        "benchmark": "cupra_formentor",
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "parameters": {**vars(args), "output": None},
+        "setup_seconds": round(setup_seconds, 6),
+        "entities": len(entity_ids),
+        "backend_requests": requests,
+        "cycle_seconds": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "max": max(latencies, default=None),
+        },
+        "state_writes_per_cycle": {
+            "mean": statistics.fmean(writes) if writes else None,
+            "max": max(writes, default=None),
+        },
+        "state_cost": state_cost,
+        "cycles": cycles,
+    }
+
+
+def main() -> int:
+    """Parse arguments, run the benchmark and write its results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=1)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per simulated request"
+    )
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0, help="chance an update fails"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write JSON here, not stdout")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_benchmark(args))
+    text = json.dumps(results, indent=2, default=str)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
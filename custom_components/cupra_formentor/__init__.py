@@ -1,99 +1,154 @@
 """The Cupra Formentor integration."""
 from __future__ import annotations
 
-from datetime import timedelta
 import logging
-import asyncio
+
+import voluptuous as vol
 
 # Import with correct structure
 from weconnect.weconnect import WeConnect
-from weconnect.elements.control_operation import ControlOperation
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall, callback
-from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .client import create_client, remove_token_file, token_file_path
+from .commands import (
+    AC_CHARGING_SPEED,
+    MIN_TARGET_SOC,
+    MIN_TARGET_TEMPERATURE,
+    TARGET_SOC,
+    TARGET_TEMPERATURE,
+    async_set_ac_charging_speed,
+    async_set_climatisation,
+    async_set_target_soc,
+    async_start_stop_charging,
+    charging_expectation,
+    climatisation_expectation,
+    set_ac_charging_speed,
+    set_climatisation,
+    set_target_soc,
+    start_stop_charging,
+)
+from .const import DATA_VALIDATED_CLIENTS, DATA_VEHICLES, DOMAIN
+from .coordinator import CupraFormentorCoordinator
+from .snapshot import VehicleSnapshot
+from .store import (
+    CupraSampleStore,
+    CupraSessionStore,
+    CupraSnapshotStore,
+    CupraTokenStore,
 )
-
-from .const import DOMAIN
 
 # Removed DEVICE_TRACKER since we're limiting sensors
 PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.BUTTON, Platform.NUMBER]
 
 _LOGGER = logging.getLogger(__name__)
 
+APPLY_SETTINGS_SCHEMA = vol.Schema(
+    {
+        vol.Required("vin"): cv.string,
+        vol.Optional("target_soc"): vol.All(
+            vol.Coerce(int), vol.Range(min=MIN_TARGET_SOC, max=100)
+        ),
+        vol.Optional("maximum_reduced"): vol.In(["maximum", "reduced"]),
+        vol.Optional("target_temp"): vol.All(
+            vol.Coerce(float), vol.Range(min=MIN_TARGET_TEMPERATURE)
+        ),
+        vol.Optional("charging"): vol.In(["start", "stop"]),
+        vol.Optional("climatisation"): vol.In(["start", "stop"]),
+    }
+)
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Cupra Formentor from a config entry."""
 
     hass.data.setdefault(DOMAIN, {})
-    _we_connect = WeConnect(
-        username=entry.data["username"],
-        password=entry.data["password"],
-        updateAfterLogin=False,
-        loginOnInit=False,
-        timeout=10
-    )
-    
-    await hass.async_add_executor_job(_we_connect.login)
-    await hass.async_add_executor_job(_we_connect.update)
-
-    async def async_update_data():
-        """Fetch data from Cupra API."""
-
-        try:
-            await asyncio.wait_for(
-                hass.async_add_executor_job(_we_connect.update),
-                timeout=120.0
-            )
-        except asyncio.TimeoutError:
-            _LOGGER.error("Timeout updating weconnect")
-            return hass.data[DOMAIN][entry.entry_id + "_vehicles"]
-        except Exception:
-            _LOGGER.error("Unknown error while updating weconnect", exc_info=1)
-            return hass.data[DOMAIN][entry.entry_id + "_vehicles"]
+    token_store = CupraTokenStore(hass, entry.entry_id)
+    snapshot_store = CupraSnapshotStore(hass, entry.entry_id)
+    tokenfile = token_file_path(hass, entry.data["username"])
 
-        vehicles = []
-
-        for vin, vehicle in _we_connect.vehicles.items():
-            vehicles.append(vehicle)
-
-        hass.data[DOMAIN][entry.entry_id + "_vehicles"] = vehicles
-        return vehicles
+    # Reuse the session the config flow just validated, if any
+    _we_connect = hass.data[DOMAIN].get(DATA_VALIDATED_CLIENTS, {}).pop(
+        entry.data["username"], None
+    )
+    validated = _we_connect is not None
+    tokens = None
+    snapshots = {}
+
+    if not validated:
+        tokens = await token_store.async_load()
+        snapshots = await snapshot_store.async_load()
+        _we_connect = await hass.async_add_executor_job(
+            create_client,
+            entry.data["username"],
+            entry.data["password"],
+            tokenfile,
+            tokens,
+        )
 
-    coordinator = DataUpdateCoordinator(
+    coordinator = CupraFormentorCoordinator(
         hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=300),
+        entry,
+        _we_connect,
+        token_store,
+        tokenfile,
+        snapshot_store,
+        restored_tokens=tokens is not None,
     )
 
-    hass.data.setdefault(DOMAIN, {})
+    await coordinator.statistics.async_load()
+    await coordinator.sessions.async_load()
     hass.data[DOMAIN][entry.entry_id + "_coordinator"] = coordinator
     hass.data[DOMAIN][entry.entry_id] = _we_connect
-    hass.data[DOMAIN][entry.entry_id + "_vehicles"] = []
 
-    # Fetch initial data so we have data when entities subscribe
-    await coordinator.async_config_entry_first_refresh()
+    if validated:
+        # The client is logged in and updated already, no need to fetch again
+        await coordinator.async_adopt_session()
+    elif snapshots:
+        # Create entities from the last known state and refresh in the background
+        coordinator.async_restore(snapshots)
+    else:
+        # Fetch initial data so we have data when entities subscribe
+        await coordinator.async_config_entry_first_refresh()
 
     # Setup components
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(coordinator.async_cancel_commands)
+
+    if snapshots:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh"
+        )
+
     @callback
     async def cupra_formentor_start_stop_charging(call: ServiceCall) -> None:
 
         vin = call.data["vin"]
+        coordinator = _coordinator_for_vin(hass, vin)
+        if coordinator is None:
+            return
         start_stop = call.data["start_stop"]
 
         if (
-            await hass.async_add_executor_job(
-                start_stop_charging,
+            await coordinator.async_command(
                 vin,
-                _we_connect,
+                async_start_stop_charging,
+                start_stop_charging,
                 start_stop,
+                expect=charging_expectation(start_stop),
             )
             is False
         ):
@@ -103,37 +158,65 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     async def cupra_formentor_set_climatisation(call: ServiceCall) -> None:
 
         vin = call.data["vin"]
+        coordinator = _coordinator_for_vin(hass, vin)
+        if coordinator is None:
+            return
         start_stop = call.data["start_stop"]
         target_temperature = 0
         if "target_temp" in call.data:
-            target_temperature = call.data["target_temp"]
+            target_temperature = float(call.data["target_temp"])
+            if target_temperature < MIN_TARGET_TEMPERATURE:
+                _LOGGER.error(
+                    "Invalid target temperature %s for %s", target_temperature, vin
+                )
+                return
+        elif start_stop not in ("start", "stop"):
+            _LOGGER.error(
+                "Climate request for %s needs start, stop or a target temperature",
+                vin,
+            )
+            return
 
-        if (
-            await hass.async_add_executor_job(
-                set_climatisation,
+        if start_stop in ("start", "stop"):
+            result = await coordinator.async_command(
                 vin,
-                _we_connect,
+                async_set_climatisation,
+                set_climatisation,
                 start_stop,
                 target_temperature,
+                expect=climatisation_expectation(start_stop),
             )
-            is False
-        ):
+        else:
+            # Only the temperature changes, coalesce it with other writes
+            result = await coordinator.async_write_setting(
+                vin,
+                TARGET_TEMPERATURE,
+                target_temperature,
+                async_set_climatisation,
+                set_climatisation,
+                start_stop,
+            )
+        if result is False:
             _LOGGER.error("Cannot send climate request to car")
 
     @callback
     async def cupra_formentor_set_target_soc(call: ServiceCall) -> None:
 
         vin = call.data["vin"]
+        coordinator = _coordinator_for_vin(hass, vin)
+        if coordinator is None:
+            return
         target_soc = 0
         if "target_soc" in call.data:
             target_soc = call.data["target_soc"]
 
         if (
-            await hass.async_add_executor_job(
-                set_target_soc,
+            await coordinator.async_write_setting(
                 vin,
-                _we_connect,
+                TARGET_SOC,
                 target_soc,
+                async_set_target_soc,
+                set_target_soc,
             )
             is False
         ):
@@ -143,18 +226,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     async def cupra_formentor_set_ac_charge_speed(call: ServiceCall) -> None:
 
         vin = call.data["vin"]
+        coordinator = _coordinator_for_vin(hass, vin)
+        if coordinator is None:
+            return
         if "maximum_reduced" in call.data:
             if (
-                await hass.async_add_executor_job(
-                    set_ac_charging_speed,
+                await coordinator.async_write_setting(
                     vin,
-                    _we_connect,
+                    AC_CHARGING_SPEED,
                     call.data["maximum_reduced"],
+                    async_set_ac_charging_speed,
+                    set_ac_charging_speed,
                 )
                 is False
             ):
                 _LOGGER.error("Cannot send ac speed request to car")
 
+    async def cupra_formentor_apply_settings(call: ServiceCall) -> ServiceResponse:
+
+        vin = call.data["vin"]
+        settings = {key: value for key, value in call.data.items() if key != "vin"}
+        coordinator = _coordinator_for_vin(hass, vin)
+        if coordinator is None:
+            return {"vin": vin, "results": dict.fromkeys(settings, "unsupported")}
+
+        results = await coordinator.async_apply_settings(vin, settings)
+        if "failed" in results.values():
+            _LOGGER.error("Cannot send some settings to car: %s", results)
+        return {"vin": vin, "results": results}
+
+    async def cupra_formentor_profile_update(call: ServiceCall) -> None:
+
+        cycles = max(1, int(call.data.get("cycles", 1)))
+        if "vin" in call.data:
+            coordinator = _coordinator_for_vin(hass, call.data["vin"])
+            coordinators = {coordinator} if coordinator is not None else set()
+        else:
+            coordinators = set(hass.data[DOMAIN].get(DATA_VEHICLES, {}).values())
+
+        for coordinator in coordinators:
+            coordinator.async_profile(cycles)
+            await coordinator.async_request_refresh()
+
     # Register our services with Home Assistant.
     hass.services.async_register(
         DOMAIN, "cupra_formentor_start_stop_charging", cupra_formentor_start_stop_charging
@@ -169,139 +282,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.services.async_register(
         DOMAIN, "cupra_formentor_set_ac_charge_speed", cupra_formentor_set_ac_charge_speed
     )
+    hass.services.async_register(
+        DOMAIN,
+        "cupra_formentor_apply_settings",
+        cupra_formentor_apply_settings,
+        schema=APPLY_SETTINGS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "cupra_formentor_profile_update", cupra_formentor_profile_update
+    )
 
     return True
 
 
-def start_stop_charging(
-    call_data_vin, api: WeConnect, operation: str
-) -> bool:
-    """Start of stop charging of your Cupra Formentor."""
-
-    for vin, vehicle in api.vehicles.items():
-        if vin == call_data_vin:
-
-            if operation == "start":
-                try:
-                    if (
-                        vehicle.controls.chargingControl is not None
-                        and vehicle.controls.chargingControl.enabled
-                    ):
-                        vehicle.controls.chargingControl.value = ControlOperation.START
-                        _LOGGER.info("Sent start charging call to the car")
-                except Exception as exc:
-                    _LOGGER.error("Failed to send request to car - %s", exc)
-                    return False
-
-            if operation == "stop":
-                try:
-                    if (
-                        vehicle.controls.chargingControl is not None
-                        and vehicle.controls.chargingControl.enabled
-                    ):
-                        vehicle.controls.chargingControl.value = ControlOperation.STOP
-                        _LOGGER.info("Sent stop charging call to the car")
-                except Exception as exc:
-                    _LOGGER.error("Failed to send request to car - %s", exc)
-                    return False
-    return True
-
-
-def set_ac_charging_speed(
-    call_data_vin, api: WeConnect, charging_speed
-) -> bool:
-    """Set charging speed in your Cupra Formentor."""
-
-    for vin, vehicle in api.vehicles.items():
-        if vin == call_data_vin:
-            try:
-                # Handle None values for hybrid vehicles
-                charging_settings = vehicle.domains.get("charging", {}).get("chargingSettings")
-                if charging_settings and hasattr(charging_settings, 'maxChargeCurrentAC'):
-                    current_speed = getattr(charging_settings.maxChargeCurrentAC, 'value', None)
-                    if current_speed is not None and charging_speed != current_speed:
-                        charging_settings.maxChargeCurrentAC.value = charging_speed
-                        _LOGGER.info("Sent charging speed call to the car")
-                else:
-                    _LOGGER.warning("Charging settings not available for this vehicle")
-            except Exception as exc:
-                _LOGGER.error("Failed to send request to car - %s", exc)
-                return False
-
-    return True
-
-
-def set_target_soc(call_data_vin, api: WeConnect, target_soc: int) -> bool:
-    """Set target SOC in your Cupra Formentor."""
-
-    target_soc = int(target_soc)
-
-    for vin, vehicle in api.vehicles.items():
-        if vin == call_data_vin:
-            try:
-                # Handle None values for hybrid vehicles
-                charging_settings = vehicle.domains.get("charging", {}).get("chargingSettings")
-                if charging_settings and hasattr(charging_settings, 'targetSOC_pct'):
-                    current_soc = getattr(charging_settings.targetSOC_pct, 'value', None)
-                    if target_soc > 10 and current_soc is not None and target_soc != current_soc:
-                        charging_settings.targetSOC_pct.value = target_soc
-                        _LOGGER.info("Sent target SoC call to the car")
-                else:
-                    _LOGGER.warning("Target SOC setting not available for this vehicle")
-            except Exception as exc:
-                _LOGGER.error("Failed to send request to car - %s", exc)
-                return False
-    return True
-
-
-def set_climatisation(
-    call_data_vin, api: WeConnect, operation: str, target_temperature: float
-) -> bool:
-    """Set climate in your Cupra Formentor."""
-
-    for vin, vehicle in api.vehicles.items():
-        if vin == call_data_vin:
-
-            try:
-                # Handle temperature setting
-                climatisation_settings = vehicle.domains.get("climatisation", {}).get("climatisationSettings")
-                if (
-                    target_temperature > 10
-                    and climatisation_settings 
-                    and hasattr(climatisation_settings, 'targetTemperature_C')
-                ):
-                    current_temp = getattr(climatisation_settings.targetTemperature_C, 'value', None)
-                    if current_temp is not None and target_temperature != current_temp:
-                        climatisation_settings.targetTemperature_C.value = float(target_temperature)
-                        _LOGGER.info("Sent target temperature call to the car")
-            except Exception as exc:
-                _LOGGER.error("Failed to send temperature request to car - %s", exc)
-                return False
-
-            if operation == "start":
-                try:
-                    if (
-                        vehicle.controls.climatizationControl is not None
-                        and vehicle.controls.climatizationControl.enabled
-                    ):
-                        vehicle.controls.climatizationControl.value = ControlOperation.START
-                        _LOGGER.info("Sent start climate call to the car")
-                except Exception as exc:
-                    _LOGGER.error("Failed to send climate start request to car - %s", exc)
-                    return False
-
-            if operation == "stop":
-                try:
-                    if (
-                        vehicle.controls.climatizationControl is not None
-                        and vehicle.controls.climatizationControl.enabled
-                    ):
-                        vehicle.controls.climatizationControl.value = ControlOperation.STOP
-                        _LOGGER.info("Sent stop climate call to the car")
-                except Exception as exc:
-                    _LOGGER.error("Failed to send climate stop request to car - %s", exc)
-                    return False
-    return True
+@callback
+def _coordinator_for_vin(
+    hass: HomeAssistant, vin: str
+) -> CupraFormentorCoordinator | None:
+    """Return the coordinator of the account that owns a vehicle."""
+    coordinator = hass.data[DOMAIN].get(DATA_VEHICLES, {}).get(vin)
+    if coordinator is None:
+        _LOGGER.error("No Cupra vehicle with VIN %s is configured", vin)
+    return coordinator
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -310,43 +313,98 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id + "_coordinator")
+        coordinator.async_unindex_vehicles()
+        await hass.async_add_executor_job(
+            remove_token_file, token_file_path(hass, entry.data["username"])
+        )
 
     return unload_ok
 
 
-def get_object_value(value) -> str:
-    """Get value from object or enum."""
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove everything stored for a deleted config entry."""
+    await CupraTokenStore(hass, entry.entry_id).async_remove()
+    await CupraSnapshotStore(hass, entry.entry_id).async_remove()
+    await CupraSampleStore(hass, entry.entry_id).async_remove()
+    await CupraSessionStore(hass, entry.entry_id).async_remove()
+
+
+class CupraFormentorAccountEntity(CoordinatorEntity):
+    """Common base for entities describing the account rather than a car."""
+
+    _attr_attribution = "Data provided by Cupra Connect"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
 
-    while hasattr(value, "value"):
-        value = value.value
+    def __init__(self, coordinator: CupraFormentorCoordinator) -> None:
+        """Initialize account entity."""
+        super().__init__(coordinator)
+        entry = coordinator.entry
 
-    return value
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer="Cupra",
+            name=f"{entry.title} ({entry.data['username']})",
+            entry_type=DeviceEntryType.SERVICE,
+        )
 
 
 class CupraFormentorBaseEntity(CoordinatorEntity):
     """Common base for Cupra Formentor entities."""
 
     _attr_attribution = "Data provided by Cupra Connect"
+    # (domain, status) pairs the entity reads, only fetched while needed
+    _required_statuses: tuple[tuple[str, str], ...] = ()
+    # Further pairs the coordinator may report as changed, never fetched
+    _notified_statuses: tuple[tuple[str, str], ...] = ()
 
     def __init__(
         self,
         we_connect: WeConnect,
-        coordinator: DataUpdateCoordinator,
-        index: int,
+        coordinator: CupraFormentorCoordinator,
+        vin: str,
     ) -> None:
         """Initialize sensor."""
         super().__init__(coordinator)
         self.we_connect = we_connect
-        self.index = index
+        self.vin = vin
+        self._vehicle = coordinator.data[vin]
 
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, f"cupra{self.data.vin}")},
             manufacturer="Cupra",
             model=f"{self.data.model}",
             name=f"{self.data.nickname} ({self.data.vin})",
+            serial_number=self.data.vin,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Register the statuses this entity needs with the coordinator."""
+        # Lets the coordinator skip this entity when none of its values changed
+        self.coordinator_context = (
+            self.vin,
+            frozenset((*self._required_statuses, *self._notified_statuses)),
+        )
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_require_statuses(self._required_statuses)
         )
 
     @property
-    def data(self):
+    def data(self) -> VehicleSnapshot:
         """Shortcut to access coordinator data for the entity."""
-        return self.coordinator.data[self.index]
\ No newline at end of file
+        return self.coordinator.data.get(self.vin, self._vehicle)
+
+    @property
+    def available(self) -> bool:
+        """Return True if the vehicle is reported and its data is recent."""
+        return (
+            super().available
+            and self.vin in self.coordinator.data
+            and not self.coordinator.is_stale(self.vin)
+        )
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""Asyncio client for the Cupra Connect endpoints used by this integration."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import json
+import logging
+from typing import Any
+
+import aiohttp
+
+from .budget import RequestBudget
+from .const import API_BASE_URL, API_TIMEOUT
+from .cycles import RequestMeter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CupraApiError(Exception):
+    """Error talking to the Cupra Connect API."""
+
+
+class CupraApiAuthError(CupraApiError):
+    """The access token was missing or rejected."""
+
+
+class CupraApiThrottledError(CupraApiError):
+    """The backend rejected a request as too frequent."""
+
+
+class CupraAsyncApi:
+    """Talk to the vehicle API over HA's shared aiohttp session.
+
+    Authentication stays with WeConnect; this client only borrows the access
+    token of the WeConnect session, so a rejected token is reported and the
+    caller falls back to the WeConnect path, which refreshes it.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        token_provider: Callable[[], str | None],
+        budget: RequestBudget | None = None,
+        meter: RequestMeter | None = None,
+    ) -> None:
+        """Initialize the client."""
+        self._session = session
+        self._token_provider = token_provider
+        self._budget = budget
+        self._meter = meter
+
+    async def async_get_vehicles(self) -> list[dict[str, Any]]:
+        """Return the vehicles of the account."""
+        data = await self._async_request("GET", "/vehicles")
+        return data.get("data", [])
+
+    async def async_get_status(
+        self, vin: str, domains: Iterable[str]
+    ) -> dict[str, Any]:
+        """Return the selective status of a vehicle for the given domains."""
+        jobs = ",".join(domains)
+        return await self._async_request(
+            "GET", f"/vehicles/{vin}/selectivestatus", params={"jobs": jobs}
+        )
+
+    async def async_control(self, vin: str, domain: str, operation: str, body=None) -> None:
+        """Start or stop charging or climatisation."""
+        await self._async_request(
+            "POST", f"/vehicles/{vin}/{domain}/{operation}", json=body or {}
+        )
+
+    async def async_set_settings(
+        self, vin: str, domain: str, settings: dict[str, Any]
+    ) -> None:
+        """Write the charging or climatisation settings of a vehicle."""
+        await self._async_request("PUT", f"/vehicles/{vin}/{domain}/settings", json=settings)
+
+    async def _async_request(
+        self, method: str, path: str, **kwargs: Any
+    ) -> dict[str, Any]:
+        """Send a request and return the decoded JSON body."""
+        token = self._token_provider()
+        if not token:
+            raise CupraApiAuthError("No access token available")
+
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
+        if self._budget is not None:
+            self._budget.spend()
+        try:
+            async with self._session.request(
+                method,
+                f"{API_BASE_URL}{path}",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=API_TIMEOUT),
+                **kwargs,
+            ) as response:
+                body = await response.read()
+                if self._meter is not None:
+                    self._meter.record(len(body))
+                if response.status in (401, 403):
+                    raise CupraApiAuthError(f"{method} {path} returned {response.status}")
+                if response.status == 429:
+                    if self._budget is not None:
+                        self._budget.throttled(_retry_after(response))
+                    raise CupraApiThrottledError(f"{method} {path} returned 429")
+                if response.status >= 400:
+                    raise CupraApiError(f"{method} {path} returned {response.status}")
+                if self._budget is not None:
+                    self._budget.succeeded()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise CupraApiError(f"{method} {path} failed: {err}") from err
+
+        if not body:
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError as err:
+            raise CupraApiError(f"{method} {path} returned invalid JSON") from err
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> float | None:
+    """Return the delay a throttling response asks for, in seconds."""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
@@ -8,7 +8,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import CupraFormentorBaseEntity, get_object_value
+from . import CupraFormentorBaseEntity
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -26,12 +26,12 @@ async def async_setup_entry(
     entities = []
 
     # Add binary sensors for each vehicle
-    for index, vehicle in enumerate(coordinator.data):
+    for vin, vehicle in coordinator.data.items():
         # Only add binary sensors that we know exist
-        if hasattr(vehicle.domains, 'charging'):
+        if vehicle.has("charging"):
             entities.extend([
-                CupraChargingConnectedSensor(we_connect, coordinator, index),
-                CupraExternalPowerSensor(we_connect, coordinator, index),
+                CupraChargingConnectedSensor(we_connect, coordinator, vin),
+                CupraExternalPowerSensor(we_connect, coordinator, vin),
             ])
 
     if entities:
@@ -40,40 +40,38 @@ async def async_setup_entry(
 class CupraChargingConnectedSensor(CupraFormentorBaseEntity, BinarySensorEntity):
     """Binary sensor for charging cable connected."""
 
-    def __init__(self, we_connect, coordinator, index) -> None:
+    _required_statuses = (("charging", "plugStatus"),)
+
+    def __init__(self, we_connect, coordinator, vin) -> None:
         """Initialize binary sensor."""
-        super().__init__(we_connect, coordinator, index)
+        super().__init__(we_connect, coordinator, vin)
         self._attr_name = f"{self.data.nickname} Cable Conectado"
         self._attr_unique_id = f"{self.data.vin}_charging_cable_connected"
 
     @property
     def is_on(self) -> bool | None:
         """Return true if charging cable is connected."""
-        try:
-            if hasattr(self.data.domains.charging, 'plugStatus'):
-                state = get_object_value(self.data.domains.charging.plugStatus.plugConnectionState)
-                return state == "connected"
-        except Exception as e:
-            _LOGGER.debug("Error getting plug connection state: %s", e)
+        if self.data.has("charging", "plugStatus"):
+            state = self.data.value("charging", "plugStatus", "plugConnectionState")
+            return state == "connected"
         return None
 
 
 class CupraExternalPowerSensor(CupraFormentorBaseEntity, BinarySensorEntity):
     """Binary sensor for external power available."""
 
-    def __init__(self, we_connect, coordinator, index) -> None:
+    _required_statuses = (("charging", "plugStatus"),)
+
+    def __init__(self, we_connect, coordinator, vin) -> None:
         """Initialize binary sensor."""
-        super().__init__(we_connect, coordinator, index)
+        super().__init__(we_connect, coordinator, vin)
         self._attr_name = f"{self.data.nickname} Energía Externa"
         self._attr_unique_id = f"{self.data.vin}_external_power"
 
     @property
     def is_on(self) -> bool | None:
         """Return true if external power is available."""
-        try:
-            if hasattr(self.data.domains.charging, 'plugStatus'):
-                state = get_object_value(self.data.domains.charging.plugStatus.externalPower)
-                return state == "available"
-        except Exception as e:
-            _LOGGER.debug("Error getting external power state: %s", e)
+        if self.data.has("charging", "plugStatus"):
+            state = self.data.value("charging", "plugStatus", "externalPower")
+            return state in ("available", "ready", "active")
         return None
\ No newline at end of file
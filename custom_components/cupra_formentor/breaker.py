@@ -0,0 +1,79 @@
+"""Circuit breaker for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+import random
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import BREAKER_BACKOFF, BREAKER_BACKOFF_MAX, BREAKER_THRESHOLD
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop polling a failing backend and probe it again with backoff.
+
+    After BREAKER_THRESHOLD consecutive failed updates the circuit opens and
+    no update runs until the backoff ends. The first update after that is a
+    single probe: success closes the circuit, failure reopens it with twice
+    the backoff, up to BREAKER_BACKOFF_MAX. Backoffs are jittered by 20% so
+    several accounts do not retry in lockstep.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a closed circuit."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_until: datetime | None = None
+        self._backoff = 0.0
+
+    def allow(self, now: datetime | None = None) -> bool:
+        """Return True if an update may run, moving to half open when due."""
+        if self.state == STATE_OPEN:
+            if (now or dt_util.utcnow()) < self.opened_until:
+                return False
+            self.state = STATE_HALF_OPEN
+            _LOGGER.debug("Probing the Cupra API after %s failed updates", self.failures)
+        return True
+
+    def record_success(self) -> bool:
+        """Close the circuit, return True if it had been failing."""
+        recovered = self.failures > 0
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_until = None
+        self._backoff = 0.0
+        return recovered
+
+    def record_failure(self, now: datetime | None = None) -> bool:
+        """Count a failed update, return True if this opened the circuit."""
+        self.failures += 1
+        if self.state != STATE_HALF_OPEN and self.failures < BREAKER_THRESHOLD:
+            return False
+
+        self._backoff = min(max(self._backoff * 2, BREAKER_BACKOFF), BREAKER_BACKOFF_MAX)
+        delay = self._backoff * random.uniform(0.8, 1.2)
+        self.state = STATE_OPEN
+        self.opened_until = (now or dt_util.utcnow()) + timedelta(seconds=delay)
+        return True
+
+    def retry_in(self, now: datetime | None = None) -> timedelta | None:
+        """Return the time until the next probe while the circuit is open."""
+        if self.state != STATE_OPEN:
+            return None
+        return max(self.opened_until - (now or dt_util.utcnow()), timedelta(seconds=1))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_until": self.opened_until.isoformat() if self.opened_until else None,
+        }
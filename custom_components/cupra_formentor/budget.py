@@ -0,0 +1,107 @@
+"""Request budget for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import THROTTLE_BACKOFF, THROTTLE_BACKOFF_MAX
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_COMMAND = "command"
+PRIORITY_POLL = "poll"
+
+
+class RequestBudget:
+    """Token bucket metering every request an account sends to the backend.
+
+    Each request spends one token, tokens refill at a steady hourly rate.
+    Polls only run while enough tokens are left above a reserve, which is
+    kept for user commands. A throttling response pauses polls for a backoff
+    that doubles with each consecutive throttle. Requests are counted from
+    worker threads too, so all state is guarded by a lock.
+    """
+
+    def __init__(self, capacity: int, per_hour: int, reserve: int) -> None:
+        """Initialize a full bucket."""
+        self.capacity = capacity
+        self.per_hour = per_hour
+        self.reserve = reserve
+        self._tokens = float(capacity)
+        self._refilled_at = time.monotonic()
+        self._backoff = 0.0
+        self._throttled_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> float:
+        """Return the tokens currently available."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def allows(self, cost: int, priority: str) -> bool:
+        """Return True if requests of this cost and priority may be sent now."""
+        with self._lock:
+            self._refill()
+            if priority == PRIORITY_COMMAND:
+                return self._tokens >= 1
+            if time.monotonic() < self._throttled_until:
+                return False
+            return self._tokens - cost >= self.reserve
+
+    def spend(self, count: int = 1) -> None:
+        """Record requests that were sent."""
+        with self._lock:
+            self._refill()
+            # Requests already sent are counted even if they overdraw the bucket
+            self._tokens -= count
+
+    def throttled(self, retry_after: float | None = None) -> None:
+        """Back off after the backend rejected a request as too frequent."""
+        with self._lock:
+            self._backoff = min(
+                max(self._backoff * 2, THROTTLE_BACKOFF), THROTTLE_BACKOFF_MAX
+            )
+            delay = max(retry_after or 0, self._backoff)
+            self._throttled_until = time.monotonic() + delay
+        _LOGGER.warning("Cupra backend is throttling requests, pausing polls for %ss", delay)
+
+    def succeeded(self) -> None:
+        """Reset the backoff after a request went through."""
+        with self._lock:
+            self._backoff = 0.0
+
+    @property
+    def throttled_until(self) -> datetime | None:
+        """Return until when polls are paused, if they are."""
+        with self._lock:
+            remaining = self._throttled_until - time.monotonic()
+        if remaining <= 0:
+            return None
+        return dt_util.utcnow() + timedelta(seconds=remaining)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        throttled_until = self.throttled_until
+        return {
+            "remaining": int(self.remaining),
+            "capacity": self.capacity,
+            "refill_per_hour": self.per_hour,
+            "reserve": self.reserve,
+            "throttled_until": throttled_until.isoformat() if throttled_until else None,
+        }
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill, caller holds the lock."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._refilled_at) * self.per_hour / 3600,
+        )
+        self._refilled_at = now
@@ -8,7 +8,17 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import get_object_value, start_stop_charging, set_climatisation, set_ac_charging_speed
+from .commands import (
+    AC_CHARGING_SPEED,
+    async_set_ac_charging_speed,
+    async_set_climatisation,
+    async_start_stop_charging,
+    charging_expectation,
+    climatisation_expectation,
+    set_ac_charging_speed,
+    set_climatisation,
+    start_stop_charging,
+)
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,20 +35,20 @@ async def async_setup_entry(
 
     entities = []
 
-    for index, vehicle in enumerate(coordinator.data):
+    for vehicle in coordinator.data.values():
         # Only add charging buttons if charging domain exists
-        if hasattr(vehicle.domains, 'charging'):
+        if vehicle.has("charging"):
             entities.extend([
-                CupraStartChargingButton(vehicle, we_connect),
-                CupraStopChargingButton(vehicle, we_connect),
-                CupraToggleACChargeSpeed(vehicle, we_connect),
+                CupraStartChargingButton(vehicle, we_connect, coordinator),
+                CupraStopChargingButton(vehicle, we_connect, coordinator),
+                CupraToggleACChargeSpeed(vehicle, we_connect, coordinator),
             ])
         
         # Only add climate buttons if climatisation domain exists
-        if hasattr(vehicle.domains, 'climatisation'):
+        if vehicle.has("climatisation"):
             entities.extend([
-                CupraStartClimateButton(vehicle, we_connect),
-                CupraStopClimateButton(vehicle, we_connect),
+                CupraStartClimateButton(vehicle, we_connect, coordinator),
+                CupraStopClimateButton(vehicle, we_connect, coordinator),
             ])
     
     if entities:
@@ -48,110 +58,121 @@ async def async_setup_entry(
 class CupraStartClimateButton(ButtonEntity):
     """Button for starting climate."""
     
-    def __init__(self, vehicle, we_connect) -> None:
+    def __init__(self, vehicle, we_connect, coordinator) -> None:
         """Initialize button."""
-        self._attr_name = f"{vehicle.nickname.value} Iniciar Climatización"
-        self._attr_unique_id = f"{vehicle.vin.value}_start_climate"
+        self._attr_name = f"{vehicle.nickname} Iniciar Climatización"
+        self._attr_unique_id = f"{vehicle.vin}_start_climate"
         self._we_connect = we_connect
         self._vehicle = vehicle
+        self._coordinator = coordinator
 
     async def async_press(self) -> None:
         """Handle button press."""
-        await self.hass.async_add_executor_job(
-            set_climatisation, 
-            self._vehicle.vin.value, 
-            self._we_connect, 
-            "start", 
-            0
+        await self._coordinator.async_command(
+            self._vehicle.vin,
+            async_set_climatisation,
+            set_climatisation,
+            "start",
+            0,
+            expect=climatisation_expectation("start"),
         )
 
 
 class CupraStopClimateButton(ButtonEntity):
     """Button for stopping climate."""
     
-    def __init__(self, vehicle, we_connect) -> None:
+    def __init__(self, vehicle, we_connect, coordinator) -> None:
         """Initialize button."""
-        self._attr_name = f"{vehicle.nickname.value} Detener Climatización"
-        self._attr_unique_id = f"{vehicle.vin.value}_stop_climate"
+        self._attr_name = f"{vehicle.nickname} Detener Climatización"
+        self._attr_unique_id = f"{vehicle.vin}_stop_climate"
         self._we_connect = we_connect
         self._vehicle = vehicle
+        self._coordinator = coordinator
 
     async def async_press(self) -> None:
         """Handle button press."""
-        await self.hass.async_add_executor_job(
+        await self._coordinator.async_command(
+            self._vehicle.vin,
+            async_set_climatisation,
             set_climatisation,
-            self._vehicle.vin.value,
-            self._we_connect,
             "stop",
-            0
+            0,
+            expect=climatisation_expectation("stop"),
         )
 
 
 class CupraStartChargingButton(ButtonEntity):
     """Button for starting charging."""
     
-    def __init__(self, vehicle, we_connect) -> None:
+    def __init__(self, vehicle, we_connect, coordinator) -> None:
         """Initialize button."""
-        self._attr_name = f"{vehicle.nickname.value} Iniciar Carga"
-        self._attr_unique_id = f"{vehicle.vin.value}_start_charging"
+        self._attr_name = f"{vehicle.nickname} Iniciar Carga"
+        self._attr_unique_id = f"{vehicle.vin}_start_charging"
         self._we_connect = we_connect
         self._vehicle = vehicle
+        self._coordinator = coordinator
 
     async def async_press(self) -> None:
         """Handle button press."""
-        await self.hass.async_add_executor_job(
+        await self._coordinator.async_command(
+            self._vehicle.vin,
+            async_start_stop_charging,
             start_stop_charging,
-            self._vehicle.vin.value,
-            self._we_connect,
-            "start"
+            "start",
+            expect=charging_expectation("start"),
         )
 
 
 class CupraStopChargingButton(ButtonEntity):
     """Button for stopping charging."""
     
-    def __init__(self, vehicle, we_connect) -> None:
+    def __init__(self, vehicle, we_connect, coordinator) -> None:
         """Initialize button."""
-        self._attr_name = f"{vehicle.nickname.value} Detener Carga"
-        self._attr_unique_id = f"{vehicle.vin.value}_stop_charging"
+        self._attr_name = f"{vehicle.nickname} Detener Carga"
+        self._attr_unique_id = f"{vehicle.vin}_stop_charging"
         self._we_connect = we_connect
         self._vehicle = vehicle
+        self._coordinator = coordinator
 
     async def async_press(self) -> None:
         """Handle button press."""
-        await self.hass.async_add_executor_job(
+        await self._coordinator.async_command(
+            self._vehicle.vin,
+            async_start_stop_charging,
             start_stop_charging,
-            self._vehicle.vin.value,
-            self._we_connect,
-            "stop"
+            "stop",
+            expect=charging_expectation("stop"),
         )
 
 
 class CupraToggleACChargeSpeed(ButtonEntity):
     """Button for toggling AC charge speed."""
     
-    def __init__(self, vehicle, we_connect) -> None:
+    def __init__(self, vehicle, we_connect, coordinator) -> None:
         """Initialize button."""
-        self._attr_name = f"{vehicle.nickname.value} Cambiar Velocidad Carga AC"
-        self._attr_unique_id = f"{vehicle.vin.value}_toggle_ac_charge_speed"
+        self._attr_name = f"{vehicle.nickname} Cambiar Velocidad Carga AC"
+        self._attr_unique_id = f"{vehicle.vin}_toggle_ac_charge_speed"
         self._we_connect = we_connect
         self._vehicle = vehicle
+        self._coordinator = coordinator
 
     async def async_press(self) -> None:
         """Handle button press."""
+        # Read the latest known setting, not the one from entity creation
+        vehicle = self._coordinator.vehicle(self._vehicle.vin) or self._vehicle
         try:
-            if hasattr(self._vehicle.domains, 'charging') and \
-               hasattr(self._vehicle.domains.charging, 'chargingSettings'):
-                current_state = get_object_value(
-                    self._vehicle.domains.charging.chargingSettings.maxChargeCurrentAC
+            if vehicle.has("charging", "chargingSettings"):
+                current_state = vehicle.value(
+                    "charging", "chargingSettings", "maxChargeCurrentAC"
                 )
                 new_state = "reduced" if current_state == "maximum" else "maximum"
                 
-                await self.hass.async_add_executor_job(
+                await self._coordinator.async_write_setting(
+                    self._vehicle.vin,
+                    AC_CHARGING_SPEED,
+                    new_state,
+                    async_set_ac_charging_speed,
                     set_ac_charging_speed,
-                    self._vehicle.vin.value,
-                    self._we_connect,
-                    new_state
                 )
         except Exception as e:
             _LOGGER.error("Error toggling AC charge speed: %s", e)
\ No newline at end of file
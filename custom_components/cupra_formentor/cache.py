@@ -0,0 +1,69 @@
+"""Tiered refresh cache for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from .const import CAPABILITIES_TTL
+
+# Statuses entities can read, in request order. The API returns whole domains,
+# and every domain holds live state, so each domain an entity reads is fetched
+# on every poll; only capabilities change rarely enough to be cached.
+STATUSES: tuple[tuple[str, str], ...] = (
+    ("charging", "batteryStatus"),
+    ("charging", "chargingStatus"),
+    ("charging", "plugStatus"),
+    ("charging", "chargingSettings"),
+    ("climatisation", "climatisationStatus"),
+    ("climatisation", "climatisationSettings"),
+)
+
+
+class TieredFetchCache:
+    """Track when domains and capabilities were fetched and decide what is due.
+
+    Capabilities and the vehicle list are refreshed every CAPABILITIES_TTL,
+    the statuses entities read on every poll.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the cache with nothing fetched yet."""
+        self._fetched_at: dict[str, datetime] = {}
+        self._capabilities_fetched_at: datetime | None = None
+
+    def due_domains(self, statuses: Iterable[tuple[str, str]]) -> list[str]:
+        """Return the domains holding the given statuses, in request order."""
+        due: list[str] = []
+        for domain, _ in statuses:
+            if domain not in due:
+                due.append(domain)
+        return due
+
+    def capabilities_due(self, now: datetime) -> bool:
+        """Return True if vehicle capabilities should be refreshed."""
+        return self._capabilities_fetched_at is None or (
+            now - self._capabilities_fetched_at
+            >= timedelta(seconds=CAPABILITIES_TTL)
+        )
+
+    def mark_fetched(
+        self, domains: Iterable[str], capabilities: bool, now: datetime
+    ) -> None:
+        """Record a successful fetch."""
+        for domain in domains:
+            self._fetched_at[domain] = now
+        if capabilities:
+            self._capabilities_fetched_at = now
+
+    def as_dict(self, now: datetime) -> dict[str, int | None]:
+        """Return the age in seconds of each cached domain."""
+        ages: dict[str, int | None] = {
+            domain: int((now - fetched_at).total_seconds())
+            for domain, fetched_at in self._fetched_at.items()
+        }
+        ages["capabilities"] = (
+            int((now - self._capabilities_fetched_at).total_seconds())
+            if self._capabilities_fetched_at
+            else None
+        )
+        return ages
@@ -0,0 +1,193 @@
+"""WeConnect client helpers for the Cupra Formentor integration."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from weconnect.weconnect import WeConnect
+from weconnect.errors import AuthentificationError
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .budget import RequestBudget
+from .const import DOMAIN
+from .cycles import RequestMeter
+from .store import CupraTokenStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def token_file_path(hass: HomeAssistant, username: str) -> str:
+    """Return the scratch token file used to hand tokens to WeConnect.
+
+    WeConnect only reads and writes tokens through a file, so the tokens kept
+    in the HA store are mirrored into this file while the client is alive.
+    """
+    digest = hashlib.sha256(username.encode()).hexdigest()[:16]
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{digest}.tokenfile")
+
+
+def create_client(
+    username: str,
+    password: str,
+    tokenfile: str,
+    tokens: dict[str, Any] | None = None,
+) -> WeConnect:
+    """Create a WeConnect client, seeding it with stored tokens if any."""
+    if tokens:
+        with open(tokenfile, "w", encoding="utf8") as file:
+            json.dump(tokens, file)
+    elif os.path.exists(tokenfile):
+        os.remove(tokenfile)
+
+    return WeConnect(
+        username=username,
+        password=password,
+        tokenfile=tokenfile,
+        updateAfterLogin=False,
+        loginOnInit=False,
+        timeout=10
+    )
+
+
+def export_tokens(we_connect: WeConnect, tokenfile: str) -> dict[str, Any] | None:
+    """Return the current session tokens of the client."""
+    try:
+        we_connect.persistTokens()
+        with open(tokenfile, "r", encoding="utf8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as exc:
+        _LOGGER.debug("Could not export WeConnect tokens: %s", exc)
+        return None
+
+
+def remove_token_file(tokenfile: str) -> None:
+    """Remove the scratch token file."""
+    try:
+        os.remove(tokenfile)
+    except FileNotFoundError:
+        pass
+
+
+def restore_session(we_connect: WeConnect, restored: bool) -> float:
+    """Bring the client into an authenticated state and fetch vehicle data.
+
+    With restored tokens the first update is attempted directly; a full login
+    only happens when the backend rejects them. Returns the seconds spent
+    logging in.
+    """
+    if restored:
+        try:
+            we_connect.update()
+        except AuthentificationError:
+            _LOGGER.info("Stored WeConnect tokens were rejected, logging in again")
+        else:
+            _LOGGER.debug("Resumed WeConnect session from stored tokens")
+            return 0.0
+
+    start = time.monotonic()
+    we_connect.login()
+    login_seconds = time.monotonic() - start
+    we_connect.update()
+    return login_seconds
+
+
+def access_token(we_connect: WeConnect) -> str | None:
+    """Return the current access token of the client's session, if any."""
+    token = getattr(getattr(we_connect, "session", None), "token", None)
+    if isinstance(token, dict):
+        return token.get("access_token")
+    return None
+
+
+class UpdateCancelled(Exception):
+    """Raised inside a worker thread to abort a timed out update."""
+
+
+# Cancel event of the job running in the current worker thread, if any
+_current_job = threading.local()
+
+
+@contextmanager
+def cancellable(cancel_event: threading.Event) -> Iterator[None]:
+    """Let the cancel hook abort the requests this thread sends in the block."""
+    _current_job.cancel_event = cancel_event
+    try:
+        yield
+    finally:
+        _current_job.cancel_event = None
+
+
+def install_cancel_hook(we_connect: WeConnect) -> bool:
+    """Abort the HTTP traffic of a cancellable job once it is cancelled.
+
+    The check runs on every response of the client's HTTP session, so a timed
+    out update stops at its next request instead of running to completion.
+    Only requests sent inside cancellable are affected; commands and other
+    calls on the same client never see the cancel event of another job.
+    """
+    session = getattr(we_connect, "session", None)
+    hooks = getattr(session, "hooks", None)
+    if not isinstance(hooks, dict):
+        _LOGGER.debug("WeConnect session does not support hooks, cannot cancel")
+        return False
+
+    def _abort_if_cancelled(response, *args, **kwargs):
+        cancel_event = getattr(_current_job, "cancel_event", None)
+        if cancel_event is not None and cancel_event.is_set():
+            response.close()
+            raise UpdateCancelled("Update cancelled after timeout")
+        return response
+
+    hooks.setdefault("response", []).append(_abort_if_cancelled)
+    return True
+
+
+def install_budget_hook(
+    we_connect: WeConnect, budget: RequestBudget, meter: RequestMeter | None = None
+) -> bool:
+    """Count every HTTP request of the client against the request budget.
+
+    With a meter, the request and its response size are counted there too.
+    """
+    session = getattr(we_connect, "session", None)
+    hooks = getattr(session, "hooks", None)
+    if not isinstance(hooks, dict):
+        _LOGGER.debug("WeConnect session does not support hooks, cannot meter it")
+        return False
+
+    def _spend(response, *args, **kwargs):
+        budget.spend()
+        if meter is not None:
+            meter.record(len(response.content or b""))
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After"))
+            except (TypeError, ValueError):
+                retry_after = None
+            budget.throttled(retry_after)
+        elif response.status_code < 400:
+            budget.succeeded()
+        return response
+
+    hooks.setdefault("response", []).append(_spend)
+    return True
+
+
+async def async_save_tokens(
+    hass: HomeAssistant,
+    we_connect: WeConnect,
+    token_store: CupraTokenStore,
+    tokenfile: str,
+) -> None:
+    """Copy the current client tokens into the HA store."""
+    tokens = await hass.async_add_executor_job(export_tokens, we_connect, tokenfile)
+    await token_store.async_save(tokens)
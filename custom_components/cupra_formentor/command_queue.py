@@ -0,0 +1,104 @@
+"""Per-vehicle command queue for the Cupra Formentor integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingWrite:
+    """Latest value waiting to be written for one setting."""
+
+    future: asyncio.Future[bool | None]
+    value: Any = None
+    current: Callable[[], Any] | None = None
+    send: Callable[[Any], Awaitable[bool | None]] | None = None
+    timer: asyncio.TimerHandle | None = None
+
+
+class VehicleCommandQueue:
+    """Debounce and coalesce settings writes to one vehicle.
+
+    Writes to the same setting within the debounce delay replace each other,
+    so a burst of slider steps sends only its last value. Every caller of a
+    coalesced burst receives the result of that single send. Writes are sent
+    one at a time, and skipped when the vehicle already reports the value.
+    """
+
+    def __init__(self, hass: HomeAssistant, vin: str, delay: float) -> None:
+        """Initialize the queue."""
+        self._hass = hass
+        self._vin = vin
+        self._delay = delay
+        self._pending: dict[Hashable, _PendingWrite] = {}
+        self._send_lock = asyncio.Lock()
+
+    async def async_submit(
+        self,
+        key: Hashable,
+        value: Any,
+        current: Callable[[], Any],
+        send: Callable[[Any], Awaitable[bool | None]],
+    ) -> bool | None:
+        """Queue a write of value to a setting and wait for its outcome."""
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = _PendingWrite(self._hass.loop.create_future())
+            self._pending[key] = pending
+        else:
+            pending.timer.cancel()
+            _LOGGER.debug(
+                "Coalescing %s write for %s, replacing %s with %s",
+                key,
+                self._vin,
+                pending.value,
+                value,
+            )
+
+        pending.value = value
+        pending.current = current
+        pending.send = send
+        pending.timer = self._hass.loop.call_later(self._delay, self._flush, key)
+        return await asyncio.shield(pending.future)
+
+    @callback
+    def _flush(self, key: Hashable) -> None:
+        """Send the latest value of a setting once the debounce delay passed."""
+        pending = self._pending.pop(key)
+        self._hass.async_create_task(
+            self._async_send(key, pending), f"cupra_formentor command {key}"
+        )
+
+    async def _async_send(self, key: Hashable, pending: _PendingWrite) -> None:
+        """Send one coalesced write and resolve everybody waiting on it."""
+        async with self._send_lock:
+            if pending.current() == pending.value:
+                _LOGGER.debug(
+                    "Skipping %s write for %s, already %s", key, self._vin, pending.value
+                )
+                result = None
+            else:
+                try:
+                    result = await pending.send(pending.value)
+                except Exception as err:  # pylint: disable=broad-except
+                    if not pending.future.done():
+                        pending.future.set_exception(err)
+                    return
+
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop all writes that were not sent yet."""
+        for pending in self._pending.values():
+            pending.timer.cancel()
+            pending.future.cancel()
+        self._pending.clear()
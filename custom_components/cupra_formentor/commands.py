@@ -0,0 +1,376 @@
+"""Vehicle commands for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from weconnect.weconnect import WeConnect
+from weconnect.elements.control_operation import ControlOperation
+
+from .api import CupraAsyncApi
+from .const import CLIMATISATION_ON_STATES
+from .snapshot import TRACKED_FIELDS, VehicleSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Snapshot fields holding the current value of each queued setting
+TARGET_SOC = ("charging", "chargingSettings", "targetSOC_pct")
+AC_CHARGING_SPEED = ("charging", "chargingSettings", "maxChargeCurrentAC")
+TARGET_TEMPERATURE = ("climatisation", "climatisationSettings", "targetTemperature_C")
+
+CHARGING_STATE = ("charging", "chargingStatus", "chargingState")
+CLIMATISATION_STATE = ("climatisation", "climatisationStatus", "climatisationState")
+
+# Lowest target SOC and temperature the vehicle accepts
+MIN_TARGET_SOC = 10
+MIN_TARGET_TEMPERATURE = 10
+
+# The WeConnect commands below return True once a request was sent, False
+# if sending failed and None if there was nothing to send. The asyncio ones
+# raise on failure and return whether they sent anything.
+
+
+@dataclass(frozen=True)
+class Expectation:
+    """Value a sent command should produce in the vehicle state.
+
+    The value is shown optimistically until a refresh confirms it, or until
+    the confirmation budget runs out and the reported value is restored.
+    """
+
+    field: tuple[str, str, str]
+    value: Any
+    confirmed: Callable[[Any], bool] | None = None
+
+    @property
+    def domain(self) -> str:
+        """Return the domain that must be refreshed to confirm the command."""
+        return self.field[0]
+
+    def is_confirmed(self, actual: Any) -> bool:
+        """Return True if the reported value shows the command took effect."""
+        if self.confirmed is not None:
+            return self.confirmed(actual)
+        return actual == self.value
+
+
+def charging_expectation(operation: str) -> Expectation | None:
+    """Return the expected outcome of a start or stop charging command."""
+    if operation == "start":
+        return Expectation(CHARGING_STATE, "charging")
+    if operation == "stop":
+        return Expectation(
+            CHARGING_STATE, "readyForCharging", lambda state: state != "charging"
+        )
+    return None
+
+
+def climatisation_expectation(operation: str) -> Expectation | None:
+    """Return the expected outcome of a start or stop climatisation command."""
+    if operation == "start":
+        return Expectation(
+            CLIMATISATION_STATE,
+            "on",
+            lambda state: state in CLIMATISATION_ON_STATES,
+        )
+    if operation == "stop":
+        return Expectation(CLIMATISATION_STATE, "off")
+    return None
+
+
+def start_stop_charging(
+    call_data_vin, api: WeConnect, operation: str
+) -> bool | None:
+    """Start of stop charging of your Cupra Formentor."""
+
+    sent = False
+    vehicle = api.vehicles.get(call_data_vin)
+    if vehicle is not None:
+        if operation == "start":
+            try:
+                if (
+                    vehicle.controls.chargingControl is not None
+                    and vehicle.controls.chargingControl.enabled
+                ):
+                    vehicle.controls.chargingControl.value = ControlOperation.START
+                    sent = True
+                    _LOGGER.info("Sent start charging call to the car")
+            except Exception as exc:
+                _LOGGER.error("Failed to send request to car - %s", exc)
+                return False
+
+        if operation == "stop":
+            try:
+                if (
+                    vehicle.controls.chargingControl is not None
+                    and vehicle.controls.chargingControl.enabled
+                ):
+                    vehicle.controls.chargingControl.value = ControlOperation.STOP
+                    sent = True
+                    _LOGGER.info("Sent stop charging call to the car")
+            except Exception as exc:
+                _LOGGER.error("Failed to send request to car - %s", exc)
+                return False
+    return True if sent else None
+
+
+def set_ac_charging_speed(
+    call_data_vin, api: WeConnect, charging_speed
+) -> bool | None:
+    """Set charging speed in your Cupra Formentor."""
+
+    sent = False
+    vehicle = api.vehicles.get(call_data_vin)
+    if vehicle is not None:
+        try:
+            # Handle None values for hybrid vehicles
+            charging_settings = vehicle.domains.get("charging", {}).get("chargingSettings")
+            if charging_settings and hasattr(charging_settings, 'maxChargeCurrentAC'):
+                current_speed = getattr(charging_settings.maxChargeCurrentAC, 'value', None)
+                if current_speed is not None and charging_speed != current_speed:
+                    charging_settings.maxChargeCurrentAC.value = charging_speed
+                    sent = True
+                    _LOGGER.info("Sent charging speed call to the car")
+            else:
+                _LOGGER.warning("Charging settings not available for this vehicle")
+        except Exception as exc:
+            _LOGGER.error("Failed to send request to car - %s", exc)
+            return False
+
+    return True if sent else None
+
+
+def set_target_soc(
+    call_data_vin, api: WeConnect, target_soc: int
+) -> bool | None:
+    """Set target SOC in your Cupra Formentor."""
+
+    target_soc = int(target_soc)
+
+    sent = False
+    vehicle = api.vehicles.get(call_data_vin)
+    if vehicle is not None:
+        try:
+            # Handle None values for hybrid vehicles
+            charging_settings = vehicle.domains.get("charging", {}).get("chargingSettings")
+            if charging_settings and hasattr(charging_settings, 'targetSOC_pct'):
+                current_soc = getattr(charging_settings.targetSOC_pct, 'value', None)
+                if (
+                    target_soc >= MIN_TARGET_SOC
+                    and current_soc is not None
+                    and target_soc != current_soc
+                ):
+                    charging_settings.targetSOC_pct.value = target_soc
+                    sent = True
+                    _LOGGER.info("Sent target SoC call to the car")
+            else:
+                _LOGGER.warning("Target SOC setting not available for this vehicle")
+        except Exception as exc:
+            _LOGGER.error("Failed to send request to car - %s", exc)
+            return False
+    return True if sent else None
+
+
+def set_climatisation(
+    call_data_vin, api: WeConnect, operation: str, target_temperature: float
+) -> bool | None:
+    """Set climate in your Cupra Formentor."""
+
+    sent = False
+    vehicle = api.vehicles.get(call_data_vin)
+    if vehicle is not None:
+        try:
+            # Handle temperature setting
+            climatisation_settings = vehicle.domains.get("climatisation", {}).get("climatisationSettings")
+            if (
+                target_temperature >= MIN_TARGET_TEMPERATURE
+                and climatisation_settings
+                and hasattr(climatisation_settings, 'targetTemperature_C')
+            ):
+                current_temp = getattr(climatisation_settings.targetTemperature_C, 'value', None)
+                if current_temp is not None and target_temperature != current_temp:
+                    climatisation_settings.targetTemperature_C.value = float(target_temperature)
+                    sent = True
+                    _LOGGER.info("Sent target temperature call to the car")
+        except Exception as exc:
+            _LOGGER.error("Failed to send temperature request to car - %s", exc)
+            return False
+
+        if operation == "start":
+            try:
+                if (
+                    vehicle.controls.climatizationControl is not None
+                    and vehicle.controls.climatizationControl.enabled
+                ):
+                    vehicle.controls.climatizationControl.value = ControlOperation.START
+                    sent = True
+                    _LOGGER.info("Sent start climate call to the car")
+            except Exception as exc:
+                _LOGGER.error("Failed to send climate start request to car - %s", exc)
+                return False
+
+        if operation == "stop":
+            try:
+                if (
+                    vehicle.controls.climatizationControl is not None
+                    and vehicle.controls.climatizationControl.enabled
+                ):
+                    vehicle.controls.climatizationControl.value = ControlOperation.STOP
+                    sent = True
+                    _LOGGER.info("Sent stop climate call to the car")
+            except Exception as exc:
+                _LOGGER.error("Failed to send climate stop request to car - %s", exc)
+                return False
+    return True if sent else None
+
+
+def set_charging_settings(
+    call_data_vin, api: WeConnect, changes: dict[str, Any]
+) -> bool | None:
+    """Set several charging settings in your Cupra Formentor."""
+
+    vehicle = api.vehicles.get(call_data_vin)
+    if vehicle is not None:
+        try:
+            charging_settings = vehicle.domains.get("charging", {}).get("chargingSettings")
+            if not charging_settings:
+                _LOGGER.warning("Charging settings not available for this vehicle")
+                return None
+            for name, value in changes.items():
+                getattr(charging_settings, name).value = value
+            _LOGGER.info("Sent charging settings call to the car")
+        except Exception as exc:
+            _LOGGER.error("Failed to send request to car - %s", exc)
+            return False
+        return True
+    return None
+
+
+async def async_start_stop_charging(
+    api: CupraAsyncApi, vehicle: VehicleSnapshot, operation: str
+) -> bool:
+    """Start or stop charging through the asyncio client."""
+
+    if operation not in ("start", "stop"):
+        return False
+    await api.async_control(vehicle.vin, "charging", operation)
+    _LOGGER.info("Sent %s charging call to the car", operation)
+    return True
+
+
+async def async_set_ac_charging_speed(
+    api: CupraAsyncApi, vehicle: VehicleSnapshot, charging_speed
+) -> bool:
+    """Set charging speed through the asyncio client."""
+
+    if not vehicle.has("charging", "chargingSettings"):
+        _LOGGER.warning("Charging settings not available for this vehicle")
+        return False
+
+    current_speed = vehicle.value("charging", "chargingSettings", "maxChargeCurrentAC")
+    if current_speed is None or charging_speed == current_speed:
+        return False
+    await api.async_set_settings(
+        vehicle.vin,
+        "charging",
+        _charging_settings(vehicle, maxChargeCurrentAC=charging_speed),
+    )
+    _LOGGER.info("Sent charging speed call to the car")
+    return True
+
+
+async def async_set_target_soc(
+    api: CupraAsyncApi, vehicle: VehicleSnapshot, target_soc: int
+) -> bool:
+    """Set target SOC through the asyncio client."""
+
+    target_soc = int(target_soc)
+
+    if not vehicle.has("charging", "chargingSettings"):
+        _LOGGER.warning("Target SOC setting not available for this vehicle")
+        return False
+
+    current_soc = vehicle.value("charging", "chargingSettings", "targetSOC_pct")
+    if (
+        target_soc < MIN_TARGET_SOC
+        or current_soc is None
+        or target_soc == current_soc
+    ):
+        return False
+    await api.async_set_settings(
+        vehicle.vin,
+        "charging",
+        _charging_settings(vehicle, targetSOC_pct=target_soc),
+    )
+    _LOGGER.info("Sent target SoC call to the car")
+    return True
+
+
+async def async_set_climatisation(
+    api: CupraAsyncApi,
+    vehicle: VehicleSnapshot,
+    operation: str,
+    target_temperature: float,
+) -> bool:
+    """Set climate through the asyncio client."""
+
+    sent = False
+    current_temp = vehicle.value(
+        "climatisation", "climatisationSettings", "targetTemperature_C"
+    )
+    if (
+        target_temperature >= MIN_TARGET_TEMPERATURE
+        and current_temp is not None
+        and target_temperature != current_temp
+    ):
+        current_temp = float(target_temperature)
+        # A start request carries the temperature, no separate write needed
+        if operation != "start":
+            await api.async_set_settings(
+                vehicle.vin, "climatisation", _climatisation_settings(current_temp)
+            )
+            sent = True
+            _LOGGER.info("Sent target temperature call to the car")
+
+    if operation in ("start", "stop"):
+        body = None
+        if operation == "start" and current_temp is not None:
+            body = _climatisation_settings(current_temp)
+        await api.async_control(vehicle.vin, "climatisation", operation, body)
+        sent = True
+        _LOGGER.info("Sent %s climate call to the car", operation)
+    return sent
+
+
+async def async_set_charging_settings(
+    api: CupraAsyncApi, vehicle: VehicleSnapshot, changes: dict[str, Any]
+) -> bool:
+    """Write several charging settings in one request."""
+
+    if not changes:
+        return False
+    await api.async_set_settings(
+        vehicle.vin, "charging", _charging_settings(vehicle, **changes)
+    )
+    _LOGGER.info("Sent charging settings call to the car")
+    return True
+
+
+def _charging_settings(vehicle: VehicleSnapshot, **changes) -> dict:
+    """Return the known charging settings with some values replaced."""
+    settings = {
+        name: vehicle.value("charging", "chargingSettings", name)
+        for name in TRACKED_FIELDS["charging"]["chargingSettings"]
+    }
+    settings.update(changes)
+    return {name: value for name, value in settings.items() if value is not None}
+
+
+def _climatisation_settings(target_temperature: float) -> dict:
+    """Return the climatisation settings payload for a target temperature."""
+    return {
+        "targetTemperature": target_temperature,
+        "targetTemperatureUnit": "celsius",
+    }
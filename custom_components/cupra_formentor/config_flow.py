@@ -7,11 +7,30 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
-
-from .const import DOMAIN
+from homeassistant.helpers import selector
+
+from .client import create_client, token_file_path
+from .const import (
+    CONF_ASYNC_CLIENT,
+    CONF_QUIET_HOURS_END,
+    CONF_QUIET_HOURS_START,
+    CONF_SCAN_INTERVAL,
+    CONF_SCAN_INTERVAL_ACTIVE,
+    CONF_SCAN_INTERVAL_IDLE,
+    CONF_SCAN_INTERVAL_QUIET,
+    CONF_STALE_AFTER,
+    DATA_VALIDATED_CLIENTS,
+    DEFAULT_ASYNC_CLIENT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL_ACTIVE,
+    DEFAULT_SCAN_INTERVAL_IDLE,
+    DEFAULT_SCAN_INTERVAL_QUIET,
+    DEFAULT_STALE_AFTER,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,7 +49,6 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     
     # Import with correct structure
     try:
-        from weconnect.weconnect import WeConnect
         from weconnect.errors import AuthentificationError, APIError
     except ImportError as err:
         _LOGGER.error("Failed to import weconnect: %s", err)
@@ -39,12 +57,11 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     _LOGGER.debug("Validating credentials for user: %s", data["username"])
 
     try:
-        we_connect = WeConnect(
-            username=data["username"],
-            password=data["password"],
-            updateAfterLogin=False,
-            loginOnInit=False,
-            timeout=10
+        we_connect = await hass.async_add_executor_job(
+            create_client,
+            data["username"],
+            data["password"],
+            token_file_path(hass, data["username"]),
         )
 
         # Test login
@@ -74,6 +91,11 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
         _LOGGER.error("Unexpected error: %s", ex)
         raise CannotConnect from ex
 
+    # Hand the logged in and updated client over to entry setup
+    hass.data.setdefault(DOMAIN, {}).setdefault(DATA_VALIDATED_CLIENTS, {})[
+        data["username"]
+    ] = we_connect
+
     return {"title": "Cupra Formentor"}
 
 
@@ -82,6 +104,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -89,13 +119,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
+            # Check if already configured before logging in
+            await self.async_set_unique_id(user_input["username"])
+            self._abort_if_unique_id_configured()
+
             try:
                 info = await validate_input(self.hass, user_input)
-                
-                # Check if already configured
-                await self.async_set_unique_id(user_input["username"])
-                self._abort_if_unique_id_configured()
-                
+
                 return self.async_create_entry(title=info["title"], data=user_input)
                 
             except CannotConnect:
@@ -115,6 +145,74 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Cupra Formentor polling options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._config_entry.options
+        seconds = vol.All(vol.Coerce(int), vol.Range(min=30, max=86400))
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SCAN_INTERVAL_ACTIVE,
+                        default=options.get(
+                            CONF_SCAN_INTERVAL_ACTIVE, DEFAULT_SCAN_INTERVAL_ACTIVE
+                        ),
+                    ): seconds,
+                    vol.Required(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): seconds,
+                    vol.Required(
+                        CONF_SCAN_INTERVAL_IDLE,
+                        default=options.get(
+                            CONF_SCAN_INTERVAL_IDLE, DEFAULT_SCAN_INTERVAL_IDLE
+                        ),
+                    ): seconds,
+                    vol.Required(
+                        CONF_SCAN_INTERVAL_QUIET,
+                        default=options.get(
+                            CONF_SCAN_INTERVAL_QUIET, DEFAULT_SCAN_INTERVAL_QUIET
+                        ),
+                    ): seconds,
+                    vol.Optional(
+                        CONF_QUIET_HOURS_START,
+                        description={
+                            "suggested_value": options.get(CONF_QUIET_HOURS_START)
+                        },
+                    ): selector.TimeSelector(),
+                    vol.Optional(
+                        CONF_QUIET_HOURS_END,
+                        description={
+                            "suggested_value": options.get(CONF_QUIET_HOURS_END)
+                        },
+                    ): selector.TimeSelector(),
+                    vol.Required(
+                        CONF_STALE_AFTER,
+                        default=options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=300, max=604800)),
+                    vol.Required(
+                        CONF_ASYNC_CLIENT,
+                        default=options.get(CONF_ASYNC_CLIENT, DEFAULT_ASYNC_CLIENT),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
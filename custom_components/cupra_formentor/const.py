@@ -1,3 +1,88 @@
 """Constants for the Cupra Formentor integration."""
 
-DOMAIN = "cupra_formentor"
\ No newline at end of file
+DOMAIN = "cupra_formentor"
+
+STORAGE_VERSION = 1
+
+# Seconds to batch snapshot writes after an update
+SNAPSHOT_SAVE_DELAY = 30
+
+# Clients validated by the config flow, waiting to be picked up by entry setup
+DATA_VALIDATED_CLIENTS = "validated_clients"
+
+# Options for the adaptive poll scheduler, intervals in seconds
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_SCAN_INTERVAL_ACTIVE = "scan_interval_active"
+CONF_SCAN_INTERVAL_IDLE = "scan_interval_idle"
+CONF_SCAN_INTERVAL_QUIET = "scan_interval_quiet"
+CONF_QUIET_HOURS_START = "quiet_hours_start"
+CONF_QUIET_HOURS_END = "quiet_hours_end"
+
+DEFAULT_SCAN_INTERVAL = 300
+DEFAULT_SCAN_INTERVAL_ACTIVE = 60
+DEFAULT_SCAN_INTERVAL_IDLE = 900
+DEFAULT_SCAN_INTERVAL_QUIET = 1800
+
+# Seconds fetched vehicle capabilities stay fresh
+CAPABILITIES_TTL = 86400
+
+# Seconds an update may run before it is cancelled
+UPDATE_TIMEOUT = 120
+
+# Vehicle API used by the asyncio client
+API_BASE_URL = "https://emea.bff.cariad.digital/vehicle/v1"
+API_TIMEOUT = 30
+
+# Opt-in: native polls do not refresh connection state or capabilities yet
+CONF_ASYNC_CLIENT = "async_client"
+DEFAULT_ASYNC_CLIENT = False
+
+# VIN to coordinator index shared by all config entries
+DATA_VEHICLES = "vehicles"
+
+# Seconds a settings write waits for a newer value before it is sent
+COMMAND_DEBOUNCE = 2
+
+# Seconds between refreshes confirming a sent command, one per attempt
+CONFIRM_DELAYS = (15, 30, 60)
+
+# Per-account request budget: bucket size, refill per hour and the part of
+# the bucket polls leave for user commands
+REQUEST_BUDGET_CAPACITY = 100
+REQUEST_BUDGET_PER_HOUR = 300
+REQUEST_BUDGET_RESERVE = 10
+
+# Seconds polls pause after the backend throttled a request, doubling up to max
+THROTTLE_BACKOFF = 60
+THROTTLE_BACKOFF_MAX = 3600
+
+# Consecutive failed updates before polling backs off, and the backoff in
+# seconds, doubling per failed probe up to the max
+BREAKER_THRESHOLD = 3
+BREAKER_BACKOFF = 120
+BREAKER_BACKOFF_MAX = 3600
+
+# Climatisation states of a running climatisation, "on" included because a
+# start command shows it until the vehicle confirms
+CLIMATISATION_ON_STATES = ("on", "heating", "cooling", "ventilation")
+
+# Seconds without a successful update before vehicle entities are unavailable
+CONF_STALE_AFTER = "stale_after"
+DEFAULT_STALE_AFTER = 3600
+
+# Poll slots and update concurrency shared by all config entries
+DATA_POLL_STAGGER = "poll_stagger"
+MAX_CONCURRENT_UPDATES = 2
+
+# Update cycles kept for diagnostics
+CYCLE_HISTORY = 20
+
+# Functions listed in the log after profiling update cycles
+PROFILE_TOP_FUNCTIONS = 25
+
+# Charging sessions: seconds between samples above which energy is estimated
+# from the SOC change, the battery capacity in kWh used until the energy per
+# percent is learned, and the finished sessions kept per vehicle
+SESSION_MAX_GAP = 900
+DEFAULT_BATTERY_CAPACITY = 12.8
+SESSION_LOG_SIZE = 50
@@ -0,0 +1,1018 @@
+"""Data update coordinator for the Cupra Formentor integration."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import replace
+from datetime import datetime, timedelta
+from functools import partial
+import logging
+import threading
+import time
+from typing import Any, TypeVar
+
+from weconnect.domain import Domain
+from weconnect.weconnect import WeConnect
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+
+from .api import CupraApiError, CupraApiThrottledError, CupraAsyncApi
+from .breaker import CircuitBreaker
+from .budget import PRIORITY_COMMAND, PRIORITY_POLL, RequestBudget
+from .cache import STATUSES, TieredFetchCache
+from .client import (
+    UpdateCancelled,
+    access_token,
+    async_save_tokens,
+    cancellable,
+    install_budget_hook,
+    install_cancel_hook,
+    restore_session,
+)
+from .command_queue import VehicleCommandQueue
+from .cycles import CycleHistory, RequestMeter, UpdateCycle
+from .commands import (
+    AC_CHARGING_SPEED,
+    MIN_TARGET_SOC,
+    MIN_TARGET_TEMPERATURE,
+    TARGET_SOC,
+    TARGET_TEMPERATURE,
+    Expectation,
+    async_set_charging_settings,
+    async_set_climatisation,
+    async_start_stop_charging,
+    charging_expectation,
+    climatisation_expectation,
+    set_charging_settings,
+    set_climatisation,
+    start_stop_charging,
+)
+from .dispatcher import VehicleDispatcher
+from .const import (
+    API_TIMEOUT,
+    COMMAND_DEBOUNCE,
+    CONFIRM_DELAYS,
+    CONF_ASYNC_CLIENT,
+    CONF_STALE_AFTER,
+    CYCLE_HISTORY,
+    DATA_POLL_STAGGER,
+    DATA_VEHICLES,
+    DEFAULT_ASYNC_CLIENT,
+    DEFAULT_STALE_AFTER,
+    DOMAIN,
+    MAX_CONCURRENT_UPDATES,
+    PROFILE_TOP_FUNCTIONS,
+    REQUEST_BUDGET_CAPACITY,
+    REQUEST_BUDGET_PER_HOUR,
+    REQUEST_BUDGET_RESERVE,
+    UPDATE_TIMEOUT,
+)
+from .profiler import CycleProfiler
+from .scheduler import PollDecision, PollScheduler, PollStagger
+from .sessions import SESSION_STATUS, ChargingSessions
+from .snapshot import (
+    TRACKED_FIELDS,
+    SnapshotChanges,
+    VehicleSnapshot,
+    diff_snapshots,
+    snapshots_from_vehicles,
+    value_key,
+)
+from .statistics_import import VehicleStatistics
+from .store import (
+    CupraSampleStore,
+    CupraSessionStore,
+    CupraSnapshotStore,
+    CupraTokenStore,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class CupraFormentorCoordinator(DataUpdateCoordinator[dict[str, VehicleSnapshot]]):
+    """Fetch vehicle data for one Cupra account."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        we_connect: WeConnect,
+        token_store: CupraTokenStore,
+        tokenfile: str,
+        snapshot_store: CupraSnapshotStore,
+        restored_tokens: bool,
+    ) -> None:
+        """Initialize the coordinator."""
+        self._scheduler = PollScheduler(entry.options)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=self._scheduler.default_interval,
+        )
+        self.poll_decision: PollDecision = self._scheduler.decide(None)
+        self.entry = entry
+        self._stagger: PollStagger = hass.data[DOMAIN].setdefault(
+            DATA_POLL_STAGGER, PollStagger(MAX_CONCURRENT_UPDATES)
+        )
+        entry.async_on_unload(self._stagger.async_register(entry.entry_id))
+        self.we_connect = we_connect
+        self._token_store = token_store
+        self._tokenfile = tokenfile
+        self._snapshot_store = snapshot_store
+        self._restored_tokens = restored_tokens
+        self._session_ready = False
+        self._restored_layout: dict[str, dict[str, list[str]]] | None = None
+        self._status_demand: Counter[tuple[str, str]] = Counter()
+        self._demand_known = False
+        self._cache = TieredFetchCache()
+        self._update_lock = asyncio.Lock()
+        # The WeConnect client is shared by all vehicles of the account
+        self._client_lock = asyncio.Lock()
+        self._dispatcher = VehicleDispatcher()
+        self._inflight: asyncio.Future | None = None
+        self._cancel_hook_installed = False
+        self.skipped_cycles = 0
+        self.last_changes: SnapshotChanges | None = None
+        self._notified_data: dict[str, VehicleSnapshot] | None = None
+        self._notified_success = True
+        self._command_queues: dict[str, VehicleCommandQueue] = {}
+        self._pending: dict[str, dict[tuple[str, str, str], Expectation]] = {}
+        self._confirm_tasks: dict[tuple[str, str], asyncio.Task] = {}
+        # Last data as reported by the vehicle, without optimistic values
+        self._confirmed_data: dict[str, VehicleSnapshot] | None = None
+        self.breaker = CircuitBreaker()
+        self._stale_after = timedelta(
+            seconds=entry.options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER)
+        )
+        self._stale_vins: set[str] = set()
+        # VINs whose charging session tracker changed since the last notify
+        self._sessions_changed: set[str] = set()
+        # Restored snapshots are not stale before the first refresh had a go
+        self._refresh_attempted = False
+        self.budget = RequestBudget(
+            REQUEST_BUDGET_CAPACITY, REQUEST_BUDGET_PER_HOUR, REQUEST_BUDGET_RESERVE
+        )
+        self.meter = RequestMeter()
+        install_budget_hook(we_connect, self.budget, self.meter)
+        self.cycles = CycleHistory(CYCLE_HISTORY)
+        self._cycle: UpdateCycle | None = None
+        self._profiler: CycleProfiler | None = None
+        self.statistics = VehicleStatistics(hass, CupraSampleStore(hass, entry.entry_id))
+        self.sessions = ChargingSessions(CupraSessionStore(hass, entry.entry_id))
+        self._api: CupraAsyncApi | None = None
+        if entry.options.get(CONF_ASYNC_CLIENT, DEFAULT_ASYNC_CLIENT):
+            self._api = CupraAsyncApi(
+                async_get_clientsession(hass),
+                partial(access_token, we_connect),
+                self.budget,
+                self.meter,
+            )
+
+    @callback
+    def async_require_statuses(
+        self, statuses: Iterable[tuple[str, str]]
+    ) -> Callable[[], None]:
+        """Register statuses an enabled entity reads, return a release callback."""
+        statuses = tuple(statuses)
+        self._status_demand.update(statuses)
+        self._demand_known = True
+
+        @callback
+        def _release() -> None:
+            self._status_demand.subtract(statuses)
+
+        return _release
+
+    @property
+    def required_statuses(self) -> list[tuple[str, str]]:
+        """Return the (domain, status) pairs entities currently read."""
+        if not self._demand_known:
+            # Entities are not set up yet, fetch everything to learn capabilities
+            required = set(STATUSES)
+        else:
+            # The poll scheduler reads charging, plug and climatisation state,
+            # always keep them where the vehicles report them
+            required = {("charging", "chargingStatus"), ("charging", "plugStatus")}
+            if any(
+                snapshot.has("climatisation", "climatisationStatus")
+                for snapshot in (self._confirmed_data or self.data or {}).values()
+            ):
+                required.add(("climatisation", "climatisationStatus"))
+            required.update(
+                status for status, count in self._status_demand.items() if count > 0
+            )
+        return [status for status in STATUSES if status in required]
+
+    async def async_adopt_session(self) -> None:
+        """Take over a client that has just been logged in and updated."""
+        self._session_ready = True
+        self._cache.mark_fetched(TRACKED_FIELDS, True, dt_util.utcnow())
+        await async_save_tokens(
+            self.hass, self.we_connect, self._token_store, self._tokenfile
+        )
+        snapshots = snapshots_from_vehicles(self.we_connect.vehicles)
+        self._confirmed_data = snapshots
+        self._async_index_vehicles(snapshots)
+        self._snapshot_store.async_schedule_save(snapshots)
+        self.statistics.async_sample(snapshots, None)
+        self._sessions_changed |= self.sessions.async_sample(snapshots, None)
+        self._async_schedule_next_poll(snapshots)
+        self.async_set_updated_data(snapshots)
+
+    @callback
+    def async_restore(self, snapshots: dict[str, VehicleSnapshot]) -> None:
+        """Seed the coordinator with stored snapshots without notifying entities."""
+        self.data = self._confirmed_data = snapshots
+        self._async_index_vehicles(snapshots)
+        self._restored_layout = _layout(snapshots)
+        self._async_schedule_next_poll(snapshots)
+
+    async def _async_update_data(self) -> dict[str, VehicleSnapshot]:
+        """Fetch data from Cupra API."""
+
+        cycle = UpdateCycle.start(self.meter)
+        try:
+            # Only one update per account may touch the WeConnect client at a time
+            if self._update_lock.locked() or (
+                self._inflight is not None and not self._inflight.done()
+            ):
+                self.skipped_cycles += 1
+                cycle.outcome = "skipped"
+                _LOGGER.debug(
+                    "Previous update still running, skipping cycle (%s skipped so far)",
+                    self.skipped_cycles,
+                )
+                return self._stale_data(UpdateFailed("Previous update still running"))
+
+            async with self._update_lock:
+                self._cycle = cycle
+                return await self._async_update_locked()
+        finally:
+            if cycle.outcome != "skipped":
+                self._refresh_attempted = True
+            # Counts all traffic of the account meanwhile, commands included
+            cycle.finish(self.meter)
+            self.cycles.append(cycle)
+            if self._profiler is not None and (cycle.succeeded or cycle.failed):
+                self._async_profiled_cycle(self._profiler)
+
+    async def _async_update_locked(self) -> dict[str, VehicleSnapshot]:
+        """Run one update cycle while holding the single-flight lock."""
+        # Polls are background traffic, let running user commands go first
+        if not await self._dispatcher.async_wait_idle(API_TIMEOUT):
+            _LOGGER.debug("Commands still running after %ss, polling anyway", API_TIMEOUT)
+
+        domains = None
+        update_capabilities = True
+        now = dt_util.utcnow()
+
+        if not self.breaker.allow(now):
+            self._cycle.outcome = "backoff"
+            return self._stale_data(UpdateFailed("Cupra API unavailable, backing off"))
+
+        if self._session_ready:
+            domains = self._cache.due_domains(self.required_statuses)
+            update_capabilities = self._cache.capabilities_due(now)
+
+        # Roughly one request for the vehicle list and one per vehicle
+        cost = 1 + max(len(self.data or {}), 1)
+        if not self.budget.allows(cost, PRIORITY_POLL):
+            _LOGGER.debug("Request budget low or backend throttling, skipping poll")
+            self._cycle.outcome = "budget"
+            return self._stale_data(UpdateFailed("Request budget exhausted"))
+
+        # Shared by all accounts, caps how many updates run at once
+        async with self._stagger.semaphore:
+            return await self._async_fetch(domains, update_capabilities, now)
+
+    async def _async_fetch(
+        self,
+        domains: list[str] | None,
+        update_capabilities: bool,
+        now: datetime,
+    ) -> dict[str, VehicleSnapshot]:
+        """Fetch the due domains, natively when possible, else through WeConnect."""
+        # Build on what the vehicle reported, not on optimistic values
+        previous = self._confirmed_data or self.data
+        cycle = self._cycle
+        cycle.domains = list(domains) if domains is not None else None
+        cycle.capabilities = update_capabilities
+
+        if self._api is not None and self._session_ready:
+            cycle.outcome = "native"
+            try:
+                async with asyncio.timeout(UPDATE_TIMEOUT):
+                    snapshots = await self._async_fetch_native(
+                        domains, update_capabilities, previous
+                    )
+            except CupraApiThrottledError as err:
+                cycle.outcome = "throttled"
+                cycle.error = str(err)
+                return self._stale_data(err)
+            except (CupraApiError, TimeoutError) as err:
+                _LOGGER.debug("Asyncio client failed, falling back to WeConnect: %s", err)
+            else:
+                self._cache.mark_fetched(domains, update_capabilities, now)
+                return self._async_finish_update(snapshots, previous)
+
+        cycle.outcome = "weconnect"
+        cancel_event = threading.Event()
+
+        def _update() -> dict[str, VehicleSnapshot]:
+            start = time.monotonic()
+            # Only this job's requests are aborted if it times out
+            with cancellable(cancel_event):
+                if not self._session_ready:
+                    cycle.login_seconds = restore_session(
+                        self.we_connect, self._restored_tokens
+                    )
+                else:
+                    self.we_connect.update(
+                        updateCapabilities=update_capabilities,
+                        updatePictures=False,
+                        selective=[Domain(domain) for domain in domains],
+                    )
+            fetched = time.monotonic()
+            cycle.update_seconds = fetched - start - cycle.login_seconds
+            if cancel_event.is_set():
+                raise UpdateCancelled("Update cancelled after timeout")
+            snapshots = snapshots_from_vehicles(
+                self.we_connect.vehicles, domains, previous
+            )
+            cycle.processing_seconds = time.monotonic() - fetched
+            return snapshots
+
+        job = _update
+        if self._profiler is not None:
+            job = partial(self._profiler.run, _update)
+        try:
+            snapshots = await self._async_run_cancellable(job, cancel_event)
+        except asyncio.TimeoutError as err:
+            return self._update_failed(err, "Timeout updating weconnect")
+        except Exception as err:  # pylint: disable=broad-except
+            return self._update_failed(err, "Unknown error while updating weconnect")
+
+        self._session_ready = True
+        self._cache.mark_fetched(
+            TRACKED_FIELDS if domains is None else domains, update_capabilities, now
+        )
+        # Refresh tokens rotate, keep the stored copy current
+        await async_save_tokens(
+            self.hass, self.we_connect, self._token_store, self._tokenfile
+        )
+        return self._async_finish_update(snapshots, previous)
+
+    async def _async_fetch_native(
+        self,
+        domains: list[str],
+        update_capabilities: bool,
+        previous: dict[str, VehicleSnapshot] | None,
+    ) -> dict[str, VehicleSnapshot]:
+        """Fetch vehicles and their status with the asyncio client.
+
+        The vehicle list only changes with the capabilities, so in between it
+        is taken from the previous snapshots and only the status is fetched.
+        """
+        previous = previous or {}
+        start = time.monotonic()
+        if update_capabilities or not previous:
+            try:
+                vehicles = sorted(
+                    await self._api.async_get_vehicles(),
+                    key=lambda vehicle: vehicle["vin"],
+                )
+            except (AttributeError, KeyError, TypeError) as err:
+                raise CupraApiError(f"Unexpected vehicle list: {err!r}") from err
+        else:
+            vehicles = [
+                {"vin": vin, "nickname": snapshot.nickname, "model": snapshot.model}
+                for vin, snapshot in sorted(previous.items())
+            ]
+
+        if domains:
+            statuses = await asyncio.gather(
+                *(
+                    self._api.async_get_status(vehicle["vin"], domains)
+                    for vehicle in vehicles
+                )
+            )
+        else:
+            statuses = [{} for _ in vehicles]
+
+        def _build() -> dict[str, VehicleSnapshot]:
+            return {
+                vehicle["vin"]: VehicleSnapshot.from_api(
+                    vehicle, status, domains, previous.get(vehicle["vin"])
+                )
+                for vehicle, status in zip(vehicles, statuses)
+            }
+
+        fetched = time.monotonic()
+        try:
+            snapshots = (
+                _build() if self._profiler is None else self._profiler.run(_build)
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as err:
+            # A malformed payload must fall back like any other API error
+            raise CupraApiError(f"Unexpected vehicle status: {err!r}") from err
+        self._cycle.update_seconds = fetched - start
+        self._cycle.processing_seconds = time.monotonic() - fetched
+        return snapshots
+
+    @callback
+    def _async_finish_update(
+        self,
+        snapshots: dict[str, VehicleSnapshot],
+        previous: dict[str, VehicleSnapshot] | None,
+    ) -> dict[str, VehicleSnapshot]:
+        """Store and schedule after a successful update."""
+        # Vehicles that could not be read are left out of the snapshots
+        self._cycle.vehicles = {
+            **dict.fromkeys(previous or {}, "failed"),
+            **dict.fromkeys(snapshots, "updated"),
+        }
+        if self.breaker.record_success():
+            _LOGGER.info("Cupra API reachable again")
+        self._async_index_vehicles(snapshots)
+        self._snapshot_store.async_schedule_save(snapshots)
+        self.statistics.async_sample(snapshots, self._cycle.domains)
+        self._sessions_changed |= self.sessions.async_sample(
+            snapshots, self._cycle.domains
+        )
+        self._check_restored_layout(snapshots)
+        self._async_schedule_next_poll(snapshots)
+        return self._apply_pending(snapshots)
+
+    @callback
+    def _async_index_vehicles(self, snapshots: dict[str, VehicleSnapshot]) -> None:
+        """Point the domain wide VIN index at this coordinator."""
+        index = self.hass.data[DOMAIN].setdefault(DATA_VEHICLES, {})
+        for vin in snapshots:
+            index[vin] = self
+
+    @callback
+    def async_unindex_vehicles(self) -> None:
+        """Remove this coordinator's vehicles from the VIN index."""
+        index = self.hass.data[DOMAIN].get(DATA_VEHICLES, {})
+        for vin in [vin for vin, owner in index.items() if owner is self]:
+            del index[vin]
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update only the entities whose values changed since the last call.
+
+        Vehicle entities register a (vin, statuses) context; anything else, and
+        every entity after a change in availability, is always updated.
+        """
+        if self._profiler is None:
+            self._async_notify_listeners()
+        else:
+            # Entity state evaluation is part of the profiled cycle
+            self._profiler.run(self._async_notify_listeners)
+
+    @callback
+    def _async_notify_listeners(self) -> None:
+        """Diff the data and call the affected listeners."""
+        previous, self._notified_data = self._notified_data, self.data
+        sessions_changed, self._sessions_changed = self._sessions_changed, set()
+        success_changed = self.last_update_success != self._notified_success
+        self._notified_success = self.last_update_success
+        if previous is None or self.data is None or success_changed:
+            self.last_changes = None
+            super().async_update_listeners()
+            return
+
+        changes = diff_snapshots(previous, self.data)
+        # Vehicles crossing the staleness window change availability
+        stale_vins = {vin for vin in self.data if self.is_stale(vin)}
+        changes.vehicles |= stale_vins ^ self._stale_vins
+        self._stale_vins = stale_vins
+        for vin in sessions_changed:
+            changes.statuses.setdefault(vin, set()).add(SESSION_STATUS)
+        self.last_changes = changes
+        notified = 0
+        for update_callback, context in list(self._listeners.values()):
+            if isinstance(context, tuple) and not changes.affects(*context):
+                continue
+            update_callback()
+            notified += 1
+        _LOGGER.debug(
+            "%s fields changed, %s unchanged, updated %s of %s entities",
+            changes.changed,
+            changes.unchanged,
+            notified,
+            len(self._listeners),
+        )
+
+    @callback
+    def async_profile(self, cycles: int) -> None:
+        """Profile the next update cycles that reach the backend."""
+        _LOGGER.info("Profiling the next %s update cycles", cycles)
+        self._profiler = CycleProfiler(cycles)
+
+    @callback
+    def _async_profiled_cycle(self, profiler: CycleProfiler) -> None:
+        """Count a profiled cycle, dump the stats after the last one."""
+        profiler.remaining -= 1
+        if profiler.remaining > 0:
+            return
+        # Runs after this cycle's entity updates, which are still profiled
+        self.entry.async_create_background_task(
+            self.hass, self._async_dump_profile(profiler), f"{DOMAIN} dump profile"
+        )
+
+    async def _async_dump_profile(self, profiler: CycleProfiler) -> None:
+        """Stop profiling, write the stats file and log the top functions."""
+        if self._profiler is profiler:
+            self._profiler = None
+        path = self.hass.config.path(
+            f"{DOMAIN}_profile_{self.entry.entry_id}_{int(time.time())}.prof"
+        )
+        summary = await self.hass.async_add_executor_job(
+            profiler.dump, path, PROFILE_TOP_FUNCTIONS
+        )
+        if summary is None:
+            _LOGGER.info("No update cycle could be profiled")
+            return
+        _LOGGER.info(
+            "Profiled %s update cycles, stats written to %s\n%s",
+            profiler.cycles,
+            path,
+            summary,
+        )
+
+    def vehicle(self, vin: str) -> VehicleSnapshot | None:
+        """Return the latest snapshot of a vehicle."""
+        return (self.data or {}).get(vin)
+
+    def confirmed_vehicle(self, vin: str) -> VehicleSnapshot | None:
+        """Return the snapshot of a vehicle without unconfirmed command values."""
+        return (self._confirmed_data or self.data or {}).get(vin)
+
+    async def async_command(
+        self,
+        vin: str,
+        async_command: Callable[..., Awaitable[bool]],
+        command: Callable[..., bool | None],
+        *args: Any,
+        expect: Expectation | None = None,
+    ) -> bool | None:
+        """Send a command, natively when possible, else through WeConnect.
+
+        Commands for one vehicle run strictly in order, commands for different
+        vehicles run concurrently. With an expectation, its value is shown
+        right away once the command is sent and a refresh of only its domain
+        confirms or rolls it back. Returns None if there was nothing to send.
+        """
+        sent = await self._dispatcher.async_run(
+            vin, partial(self._async_send, vin, async_command, command, *args)
+        )
+        if sent and expect is not None:
+            self._async_expect(vin, expect)
+        return sent
+
+    async def _async_send(
+        self,
+        vin: str,
+        async_command: Callable[..., Awaitable[bool]],
+        command: Callable[..., bool | None],
+        *args: Any,
+    ) -> bool | None:
+        """Send one command, the caller holds the vehicle's dispatcher slot."""
+        if not self.budget.allows(1, PRIORITY_COMMAND):
+            _LOGGER.error("Request budget exhausted, not sending command to %s", vin)
+            return False
+
+        # Payloads carry what the vehicle reported, not values still pending
+        vehicle = self.confirmed_vehicle(vin)
+        if self._api is not None and self._session_ready and vehicle is not None:
+            try:
+                sent = await async_command(self._api, vehicle, *args)
+            except CupraApiThrottledError:
+                _LOGGER.error("Cupra backend is throttling, command to %s not sent", vin)
+                return False
+            except CupraApiError as err:
+                _LOGGER.debug("Asyncio client failed, falling back to WeConnect: %s", err)
+            else:
+                return True if sent else None
+
+        return await self._async_client_job(command, vin, self.we_connect, *args)
+
+    async def async_apply_settings(
+        self, vin: str, settings: dict[str, Any]
+    ) -> dict[str, str]:
+        """Send several settings and start/stop commands as one batch.
+
+        Values the vehicle already reports are skipped, both charging settings
+        go out in a single write and a climatisation start carries its target
+        temperature. Returns the outcome of every requested field: sent,
+        unchanged, failed, unsupported or invalid.
+        """
+        results: dict[str, str] = {}
+        expectations: list[Expectation] = []
+
+        async def _batch() -> None:
+            vehicle = self.confirmed_vehicle(vin)
+            valid = {
+                "target_soc": MIN_TARGET_SOC
+                <= settings.get("target_soc", 0)
+                <= 100,
+                "maximum_reduced": settings.get("maximum_reduced")
+                in ("maximum", "reduced"),
+                "target_temp": settings.get("target_temp", 0)
+                >= MIN_TARGET_TEMPERATURE,
+            }
+
+            def _changed(key: str, setting: tuple[str, str, str]) -> bool:
+                """Record why a setting is not sent, return True if it is."""
+                if key not in settings:
+                    return False
+                if not valid[key]:
+                    results[key] = "invalid"
+                elif not vehicle.has(setting[0], setting[1]):
+                    results[key] = "unsupported"
+                elif vehicle.value(*setting) == settings[key]:
+                    results[key] = "unchanged"
+                else:
+                    return True
+                return False
+
+            async def _send(
+                keys: dict[str, Expectation | None], *command: Any
+            ) -> None:
+                sent = await self._async_send(vin, *command)
+                for key, expectation in keys.items():
+                    if sent is None:
+                        results[key] = "unchanged"
+                        continue
+                    results[key] = "sent" if sent else "failed"
+                    if sent and expectation is not None:
+                        expectations.append(expectation)
+
+            # Charging settings first, so a charge started below uses them
+            charging_changes = {
+                key: Expectation(setting, settings[key])
+                for key, setting in (
+                    ("target_soc", TARGET_SOC),
+                    ("maximum_reduced", AC_CHARGING_SPEED),
+                )
+                if _changed(key, setting)
+            }
+            if charging_changes:
+                await _send(
+                    charging_changes,
+                    async_set_charging_settings,
+                    set_charging_settings,
+                    {
+                        expectation.field[2]: expectation.value
+                        for expectation in charging_changes.values()
+                    },
+                )
+
+            if "charging" in settings:
+                if (expectation := charging_expectation(settings["charging"])) is None:
+                    results["charging"] = "invalid"
+                else:
+                    await _send(
+                        {"charging": expectation},
+                        async_start_stop_charging,
+                        start_stop_charging,
+                        settings["charging"],
+                    )
+
+            # One climatisation command covers the temperature and start/stop
+            climate: dict[str, Expectation | None] = {}
+            target_temperature = 0
+            if _changed("target_temp", TARGET_TEMPERATURE):
+                target_temperature = settings["target_temp"]
+                climate["target_temp"] = Expectation(
+                    TARGET_TEMPERATURE, target_temperature
+                )
+            operation = settings.get("climatisation", "none")
+            if "climatisation" in settings:
+                if (expectation := climatisation_expectation(operation)) is None:
+                    results["climatisation"] = "invalid"
+                    operation = "none"
+                else:
+                    climate["climatisation"] = expectation
+            if climate:
+                await _send(
+                    climate,
+                    async_set_climatisation,
+                    set_climatisation,
+                    operation,
+                    target_temperature,
+                )
+
+        if self.confirmed_vehicle(vin) is None:
+            return dict.fromkeys(settings, "unsupported")
+
+        await self._dispatcher.async_run(vin, _batch)
+        for expectation in expectations:
+            self._async_expect(vin, expectation)
+        return results
+
+    @callback
+    def _async_expect(self, vin: str, expectation: Expectation) -> None:
+        """Show the expected outcome of a command until it is confirmed."""
+        self._pending.setdefault(vin, {})[expectation.field] = expectation
+        if self.data is not None and vin in self.data:
+            self.data = self._apply_pending(self._confirmed_data or self.data)
+            self.async_update_listeners()
+
+        # A newer command restarts the confirmation budget of its domain
+        key = (vin, expectation.domain)
+        if (task := self._confirm_tasks.pop(key, None)) is not None:
+            task.cancel()
+        self._confirm_tasks[key] = self.entry.async_create_background_task(
+            self.hass,
+            self._async_confirm(vin, expectation.domain),
+            f"{DOMAIN} confirm {expectation.domain}",
+        )
+
+    def _pending_in(self, vin: str, domain: str) -> list[tuple[str, str, str]]:
+        """Return the unconfirmed fields of a vehicle domain."""
+        return [field for field in self._pending.get(vin, {}) if field[0] == domain]
+
+    def _apply_pending(
+        self, snapshots: dict[str, VehicleSnapshot]
+    ) -> dict[str, VehicleSnapshot]:
+        """Drop confirmed expectations and overlay the remaining ones."""
+        self._confirmed_data = snapshots
+        overlaid = dict(snapshots)
+        for vin, pending in self._pending.items():
+            snapshot = snapshots.get(vin)
+            if snapshot is None or not pending:
+                continue
+            values = dict(snapshot.values)
+            for field, expectation in list(pending.items()):
+                if expectation.is_confirmed(snapshot.value(*field)):
+                    _LOGGER.debug("Vehicle %s confirmed %s", vin, field)
+                    del pending[field]
+                else:
+                    values[value_key(*field)] = expectation.value
+            overlaid[vin] = replace(snapshot, values=values)
+        return overlaid
+
+    async def _async_confirm(self, vin: str, domain: str) -> None:
+        """Refresh one domain of a vehicle until pending commands are confirmed."""
+        for delay in CONFIRM_DELAYS:
+            await asyncio.sleep(delay)
+            if not self._pending_in(vin, domain):
+                return
+            if not self.budget.allows(1, PRIORITY_COMMAND):
+                continue
+            try:
+                async with self._update_lock:
+                    snapshots = await self._dispatcher.async_run(
+                        vin, partial(self._async_fetch_domain, vin, domain)
+                    )
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Confirmation refresh of %s failed: %s", domain, err)
+                continue
+
+            self._cache.mark_fetched([domain], False, dt_util.utcnow())
+            self._snapshot_store.async_schedule_save(snapshots)
+            self.data = self._apply_pending(snapshots)
+            self.async_update_listeners()
+            if not self._pending_in(vin, domain):
+                return
+
+        # Budget spent, show what the vehicle reports instead
+        for field in self._pending_in(vin, domain):
+            _LOGGER.warning(
+                "Vehicle %s did not confirm %s, restoring reported value", vin, field
+            )
+            del self._pending[vin][field]
+        if self._confirmed_data is not None:
+            self.data = self._apply_pending(self._confirmed_data)
+            self.async_update_listeners()
+
+    async def _async_fetch_domain(
+        self, vin: str, domain: str
+    ) -> dict[str, VehicleSnapshot]:
+        """Fetch a single domain of a vehicle, without a full update."""
+        previous = self._confirmed_data or self.data or {}
+        vehicle = previous[vin]
+        if self._api is not None and self._session_ready:
+            try:
+                async with asyncio.timeout(API_TIMEOUT):
+                    status = await self._api.async_get_status(vin, [domain])
+            except CupraApiThrottledError:
+                raise
+            except (CupraApiError, TimeoutError) as err:
+                _LOGGER.debug("Asyncio client failed, falling back to WeConnect: %s", err)
+            else:
+                identity = {
+                    "vin": vin,
+                    "nickname": vehicle.nickname,
+                    "model": vehicle.model,
+                }
+                try:
+                    snapshot = VehicleSnapshot.from_api(
+                        identity, status, [domain], vehicle
+                    )
+                except (AttributeError, KeyError, TypeError, ValueError) as err:
+                    _LOGGER.debug("Unexpected status, falling back to WeConnect: %r", err)
+                else:
+                    return {**previous, vin: snapshot}
+
+        cancel_event = threading.Event()
+
+        def _update() -> dict[str, VehicleSnapshot]:
+            # WeConnect refreshes the domain of every vehicle of the account,
+            # bound it like a poll so a hung request cannot hold the locks
+            with cancellable(cancel_event):
+                self.we_connect.update(
+                    updateCapabilities=False,
+                    updatePictures=False,
+                    selective=[Domain(domain)],
+                )
+            if cancel_event.is_set():
+                raise UpdateCancelled("Confirmation refresh cancelled after timeout")
+            return snapshots_from_vehicles(self.we_connect.vehicles, [domain], previous)
+
+        return await self._async_run_cancellable(_update, cancel_event)
+
+    async def async_write_setting(
+        self,
+        vin: str,
+        setting: tuple[str, str, str],
+        value: Any,
+        async_command: Callable[..., Awaitable[bool]],
+        command: Callable[..., bool | None],
+        *args: Any,
+    ) -> bool | None:
+        """Queue a settings write, sending only the last value of a burst.
+
+        setting is the (domain, status, field) holding the current value; the
+        write is skipped if the vehicle already reports the target value. The
+        value is passed to the command after args.
+        """
+        queue = self._command_queues.get(vin)
+        if queue is None:
+            queue = self._command_queues[vin] = VehicleCommandQueue(
+                self.hass, vin, COMMAND_DEBOUNCE
+            )
+
+        def _current() -> Any:
+            vehicle = self.confirmed_vehicle(vin)
+            return vehicle.value(*setting) if vehicle is not None else None
+
+        async def _send(latest: Any) -> bool | None:
+            return await self.async_command(
+                vin,
+                async_command,
+                command,
+                *args,
+                latest,
+                expect=Expectation(setting, latest),
+            )
+
+        return await queue.async_submit(setting, value, _current, _send)
+
+    @callback
+    def async_cancel_commands(self) -> None:
+        """Drop queued settings writes, used when the entry unloads."""
+        for queue in self._command_queues.values():
+            queue.async_cancel()
+
+    async def _async_run_cancellable(
+        self,
+        job: Callable[[], dict[str, VehicleSnapshot]],
+        cancel_event: threading.Event,
+    ) -> dict[str, VehicleSnapshot]:
+        """Run a blocking job, asking it to stop if it exceeds the timeout."""
+        if not self._cancel_hook_installed:
+            self._cancel_hook_installed = install_cancel_hook(self.we_connect)
+
+        future = await self._async_client_job_future(job)
+        self._inflight = future
+        # A cancelled job ends with an exception nobody awaits any more
+        future.add_done_callback(lambda fut: fut.cancelled() or fut.exception())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), UPDATE_TIMEOUT)
+        except asyncio.TimeoutError:
+            # The worker thread keeps running until its next request, make it stop
+            cancel_event.set()
+            raise
+
+    async def _async_client_job(self, job: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking WeConnect call once no other call is using the client."""
+        future = await self._async_client_job_future(job, *args)
+        return await asyncio.shield(future)
+
+    async def _async_client_job_future(
+        self, job: Callable[..., _T], *args: Any
+    ) -> asyncio.Future[_T]:
+        """Start a blocking WeConnect call, holding the client until it ends.
+
+        The lock is released when the worker finishes, not when the caller
+        stops waiting, so a timed out job still keeps others off the client.
+        """
+        await self._client_lock.acquire()
+        future = self.hass.async_add_executor_job(job, *args)
+        future.add_done_callback(lambda _: self._client_lock.release())
+        return future
+
+    def _update_failed(self, err: Exception, message: str) -> dict[str, VehicleSnapshot]:
+        """Count a failed update and log it without flooding the log."""
+        self._cycle.outcome = "failed"
+        self._cycle.error = f"{message}: {err}"
+        opened = self.breaker.record_failure()
+        if self.breaker.failures == 1:
+            _LOGGER.error("%s: %s", message, err)
+            _LOGGER.debug("Update failure details", exc_info=err)
+        elif opened:
+            _LOGGER.warning(
+                "%s: %s failed updates in a row, next attempt in %s",
+                message,
+                self.breaker.failures,
+                self.breaker.retry_in(),
+            )
+        else:
+            _LOGGER.debug("%s: %s", message, err)
+        return self._stale_data(err)
+
+    def _stale_data(self, err: Exception) -> dict[str, VehicleSnapshot]:
+        """Keep serving the last known data, fail if there is none yet."""
+        self._async_schedule_next_poll(self.data)
+        if self.data is None:
+            raise UpdateFailed(f"Error communicating with Cupra API: {err}") from err
+        return self.data
+
+    def scheduler_state(self) -> dict[str, Any]:
+        """Return the polling, cache and backoff state for diagnostics."""
+        return {
+            "update_interval": self.update_interval.total_seconds()
+            if self.update_interval
+            else None,
+            "poll_decision": self.poll_decision.as_dict(),
+            "stagger": self._stagger.as_dict(self.entry.entry_id),
+            "cache_ages": self._cache.as_dict(dt_util.utcnow()),
+            "session_ready": self._session_ready,
+            "skipped_cycles": self.skipped_cycles,
+            "breaker": self.breaker.as_dict(),
+            "budget": self.budget.as_dict(),
+            "pending_commands": {
+                vin: [value_key(*field) for field in pending]
+                for vin, pending in self._pending.items()
+                if pending
+            },
+        }
+
+    def is_stale(self, vin: str) -> bool:
+        """Return True if a vehicle has not been updated within the window."""
+        if not self._refresh_attempted:
+            return False
+        snapshot = self.confirmed_vehicle(vin)
+        if snapshot is None or snapshot.updated_at is None:
+            return False
+        return dt_util.utcnow() - snapshot.updated_at > self._stale_after
+
+    @callback
+    def _async_schedule_next_poll(
+        self, snapshots: dict[str, VehicleSnapshot] | None
+    ) -> None:
+        """Adapt the poll interval to the state of the vehicles."""
+        decision = self._scheduler.decide(snapshots)
+        if decision != self.poll_decision:
+            _LOGGER.debug(
+                "Polling every %s (%s): %s",
+                decision.interval,
+                decision.mode,
+                decision.reason,
+            )
+        self.poll_decision = decision
+        # While the circuit is open the next poll is its probe
+        self.update_interval = self.breaker.retry_in() or self._stagger.interval_for(
+            self.entry.entry_id, decision.interval, dt_util.utcnow()
+        )
+
+    @callback
+    def _check_restored_layout(self, snapshots: dict[str, VehicleSnapshot]) -> None:
+        """Reload once if the live data does not match the stored entity layout."""
+        if self._restored_layout is None:
+            return
+
+        restored_layout, self._restored_layout = self._restored_layout, None
+        if _layout(snapshots) != restored_layout:
+            _LOGGER.info("Vehicles or capabilities changed, reloading entities")
+            self.hass.config_entries.async_schedule_reload(self.entry.entry_id)
+
+
+def _layout(snapshots: dict[str, VehicleSnapshot]) -> dict[str, dict[str, list[str]]]:
+    """Return the per-VIN capability map entities are created from."""
+    return {vin: snapshot.capabilities for vin, snapshot in snapshots.items()}
@@ -0,0 +1,150 @@
+"""Update cycle records for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+import threading
+import time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+
+# Outcomes of cycles that went to the backend
+SUCCEEDED_OUTCOMES = ("native", "weconnect")
+FAILED_OUTCOMES = ("failed", "throttled")
+
+
+class RequestMeter:
+    """Count HTTP requests and response bytes, from worker threads too.
+
+    Requests are also counted per minute in a ring of the last hour, which
+    gives the request rate without keeping a timestamp per request.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._bytes = 0
+        # [minute, requests] pairs, oldest first
+        self._minutes: deque[list[int]] = deque(maxlen=60)
+
+    def record(self, size: int) -> None:
+        """Count one response of size bytes."""
+        minute = int(time.monotonic() // 60)
+        with self._lock:
+            self._requests += 1
+            self._bytes += size
+            if self._minutes and self._minutes[-1][0] == minute:
+                self._minutes[-1][1] += 1
+            else:
+                self._minutes.append([minute, 1])
+
+    def per_hour(self) -> int:
+        """Return the requests sent during the last hour."""
+        minute = int(time.monotonic() // 60)
+        with self._lock:
+            return sum(count for at, count in self._minutes if at > minute - 60)
+
+    def totals(self) -> tuple[int, int]:
+        """Return the requests and bytes counted so far."""
+        with self._lock:
+            return self._requests, self._bytes
+
+
+@dataclass
+class UpdateCycle:
+    """What one update cycle did and how long each part took."""
+
+    started_at: datetime
+    # native, weconnect, backoff, budget, throttled, skipped or failed
+    outcome: str = "running"
+    domains: list[str] | None = None
+    capabilities: bool = False
+    login_seconds: float = 0.0
+    update_seconds: float = 0.0
+    processing_seconds: float = 0.0
+    total_seconds: float = 0.0
+    requests: int = 0
+    response_bytes: int = 0
+    vehicles: dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+    _start: float = field(default_factory=time.monotonic, repr=False)
+    _meter_start: tuple[int, int] = (0, 0)
+
+    @classmethod
+    def start(cls, meter: RequestMeter) -> UpdateCycle:
+        """Begin recording a cycle."""
+        return cls(started_at=dt_util.utcnow(), _meter_start=meter.totals())
+
+    def finish(self, meter: RequestMeter) -> None:
+        """Record the total time and the traffic of the cycle."""
+        self.total_seconds = time.monotonic() - self._start
+        requests, size = meter.totals()
+        self.requests = requests - self._meter_start[0]
+        self.response_bytes = size - self._meter_start[1]
+
+    @property
+    def succeeded(self) -> bool:
+        """Return True if the cycle fetched fresh data."""
+        return self.outcome in SUCCEEDED_OUTCOMES
+
+    @property
+    def failed(self) -> bool:
+        """Return True if the cycle went to the backend and failed."""
+        return self.outcome in FAILED_OUTCOMES
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "outcome": self.outcome,
+            "domains": self.domains,
+            "capabilities": self.capabilities,
+            "login_seconds": round(self.login_seconds, 3),
+            "update_seconds": round(self.update_seconds, 3),
+            "processing_seconds": round(self.processing_seconds, 3),
+            "total_seconds": round(self.total_seconds, 3),
+            "requests": self.requests,
+            "response_bytes": self.response_bytes,
+            "vehicles": self.vehicles,
+            "error": self.error,
+        }
+
+
+class CycleHistory(deque):
+    """The most recent update cycles, oldest first.
+
+    Successful and failed cycles are also counted since setup, beyond the
+    cycles kept.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty history keeping size cycles."""
+        super().__init__(maxlen=size)
+        self.succeeded = 0
+        self.failed = 0
+
+    def append(self, cycle: UpdateCycle) -> None:
+        """Keep a finished cycle and count its outcome."""
+        super().append(cycle)
+        if cycle.succeeded:
+            self.succeeded += 1
+        elif cycle.failed:
+            self.failed += 1
+
+    def duration_percentile(self, percent: float) -> float | None:
+        """Return the nearest-rank percentile duration of backend cycles."""
+        durations = sorted(
+            cycle.total_seconds for cycle in self if cycle.succeeded or cycle.failed
+        )
+        if not durations:
+            return None
+        rank = max(0, min(len(durations) - 1, round(percent / 100 * len(durations)) - 1))
+        return durations[rank]
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the cycles as JSON serializable dicts."""
+        return [cycle.as_dict() for cycle in self]
@@ -0,0 +1,67 @@
+"""Diagnostics support for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    "vin",
+    "nickname",
+    "access_token",
+    "refresh_token",
+    "id_token",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the recent update cycles and polling state of an account."""
+    coordinator = hass.data[DOMAIN][entry.entry_id + "_coordinator"]
+    vehicles = {
+        vin: async_redact_data(snapshot.as_dict(), TO_REDACT)
+        for vin, snapshot in (coordinator.data or {}).items()
+    }
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "scheduler": coordinator.scheduler_state(),
+        "cycles": coordinator.cycles.as_list(),
+        "vehicles": vehicles,
+        "charging_sessions": {
+            vin: [session.as_dict() for session in tracker.log]
+            for vin in vehicles
+            if (tracker := coordinator.sessions.tracker(vin)) is not None
+        },
+    }
+    vins = sorted(
+        {*vehicles, *(vin for cycle in coordinator.cycles for vin in cycle.vehicles)}
+    )
+    return _redact_vins(
+        diagnostics, {vin: f"vehicle_{index}" for index, vin in enumerate(vins)}
+    )
+
+
+def _redact_vins(data: Any, aliases: dict[str, str]) -> Any:
+    """Replace VINs in keys and values, error messages included, with aliases."""
+    if isinstance(data, dict):
+        return {
+            _redact_vins(key, aliases): _redact_vins(value, aliases)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [_redact_vins(item, aliases) for item in data]
+    if isinstance(data, str):
+        for vin, alias in aliases.items():
+            data = data.replace(vin, alias)
+    return data
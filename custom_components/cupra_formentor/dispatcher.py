@@ -0,0 +1,57 @@
+"""Per-vehicle operation dispatcher for the Cupra Formentor integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class VehicleDispatcher:
+    """Run vehicle operations in order per VIN and concurrently across VINs.
+
+    Each VIN has its own FIFO lock, so operations on one car never overlap
+    while different cars proceed in parallel. Polls wait for the dispatcher
+    to go idle before they start, so user commands are not queued behind
+    background traffic.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the dispatcher."""
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def active(self) -> int:
+        """Return the number of operations running or waiting for their VIN."""
+        return self._active
+
+    async def async_run(self, vin: str, job: Callable[[], Awaitable[_T]]) -> _T:
+        """Run job once every earlier operation on the same VIN has finished."""
+        lock = self._locks.setdefault(vin, asyncio.Lock())
+        self._active += 1
+        self._idle.clear()
+        try:
+            if lock.locked():
+                _LOGGER.debug("Waiting for earlier operations on %s", vin)
+            async with lock:
+                return await job()
+        finally:
+            self._active -= 1
+            if not self._active:
+                self._idle.set()
+
+    async def async_wait_idle(self, timeout: float) -> bool:
+        """Wait until no operation is running, return False on timeout."""
+        try:
+            async with asyncio.timeout(timeout):
+                await self._idle.wait()
+        except TimeoutError:
+            return False
+        return True
@@ -10,7 +10,15 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import CupraFormentorBaseEntity, get_object_value, set_climatisation, set_target_soc
+from . import CupraFormentorBaseEntity
+from .commands import (
+    TARGET_SOC,
+    TARGET_TEMPERATURE,
+    async_set_climatisation,
+    async_set_target_soc,
+    set_climatisation,
+    set_target_soc,
+)
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,16 +35,14 @@ async def async_setup_entry(
 
     entities = []
 
-    for index, vehicle in enumerate(coordinator.data):
+    for vin, vehicle in coordinator.data.items():
         # Only add target SOC if charging domain exists
-        if hasattr(vehicle.domains, 'charging') and \
-           hasattr(vehicle.domains.charging, 'chargingSettings'):
-            entities.append(CupraTargetSoCNumber(we_connect, coordinator, index))
+        if vehicle.has("charging", "chargingSettings"):
+            entities.append(CupraTargetSoCNumber(we_connect, coordinator, vin))
         
         # Only add target temperature if climatisation domain exists
-        if hasattr(vehicle.domains, 'climatisation') and \
-           hasattr(vehicle.domains.climatisation, 'climatisationSettings'):
-            entities.append(CupraTargetClimateNumber(we_connect, coordinator, index))
+        if vehicle.has("climatisation", "climatisationSettings"):
+            entities.append(CupraTargetClimateNumber(we_connect, coordinator, vin))
     
     if entities:
         async_add_entities(entities)
@@ -45,15 +51,16 @@ async def async_setup_entry(
 class CupraTargetSoCNumber(CupraFormentorBaseEntity, NumberEntity):
     """Representation of a Target State of Charge entity."""
 
+    _required_statuses = (("charging", "chargingSettings"),)
     _attr_entity_category = EntityCategory.CONFIG
     _attr_native_unit_of_measurement = PERCENTAGE
     _attr_icon = "mdi:battery-charging"
 
-    def __init__(self, we_connect, coordinator, index) -> None:
+    def __init__(self, we_connect, coordinator, vin) -> None:
         """Initialize entity."""
-        super().__init__(we_connect, coordinator, index)
-        self._attr_name = f"{self.data.nickname.value} SOC Objetivo"
-        self._attr_unique_id = f"{self.data.vin.value}_target_state_of_charge"
+        super().__init__(we_connect, coordinator, vin)
+        self._attr_name = f"{self.data.nickname} SOC Objetivo"
+        self._attr_unique_id = f"{self.data.vin}_target_state_of_charge"
         self._attr_native_min_value = 10
         self._attr_native_max_value = 100
         self._attr_native_step = 10
@@ -61,37 +68,37 @@ class CupraTargetSoCNumber(CupraFormentorBaseEntity, NumberEntity):
     @property
     def native_value(self) -> float | None:
         """Return the current value."""
+        value = self.data.value("charging", "chargingSettings", "targetSOC_pct")
         try:
-            return int(get_object_value(
-                self.data.domains.charging.chargingSettings.targetSOC_pct
-            ))
-        except Exception as e:
-            _LOGGER.debug("Error getting target SOC: %s", e)
+            return int(value)
+        except (TypeError, ValueError):
             return None
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the value."""
         if value >= 10:
-            await self.hass.async_add_executor_job(
+            await self.coordinator.async_write_setting(
+                self.data.vin,
+                TARGET_SOC,
+                int(value),
+                async_set_target_soc,
                 set_target_soc,
-                self.data.vin.value,
-                self.we_connect,
-                int(value)
             )
 
 
 class CupraTargetClimateNumber(CupraFormentorBaseEntity, NumberEntity):
     """Representation of a Target Climate Temperature entity."""
 
+    _required_statuses = (("climatisation", "climatisationSettings"),)
     _attr_entity_category = EntityCategory.CONFIG
     _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
     _attr_icon = "mdi:thermometer"
 
-    def __init__(self, we_connect, coordinator, index) -> None:
+    def __init__(self, we_connect, coordinator, vin) -> None:
         """Initialize entity."""
-        super().__init__(we_connect, coordinator, index)
-        self._attr_name = f"{self.data.nickname.value} Temperatura Objetivo"
-        self._attr_unique_id = f"{self.data.vin.value}_target_climate_temperature"
+        super().__init__(we_connect, coordinator, vin)
+        self._attr_name = f"{self.data.nickname} Temperatura Objetivo"
+        self._attr_unique_id = f"{self.data.vin}_target_climate_temperature"
         self._attr_native_min_value = 10
         self._attr_native_max_value = 30
         self._attr_native_step = 0.5
@@ -99,21 +106,22 @@ class CupraTargetClimateNumber(CupraFormentorBaseEntity, NumberEntity):
     @property
     def native_value(self) -> float | None:
         """Return the current value."""
+        value = self.data.value(
+            "climatisation", "climatisationSettings", "targetTemperature_C"
+        )
         try:
-            return float(get_object_value(
-                self.data.domains.climatisation.climatisationSettings.targetTemperature_C
-            ))
-        except Exception as e:
-            _LOGGER.debug("Error getting target temperature: %s", e)
+            return float(value)
+        except (TypeError, ValueError):
             return None
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the value."""
         if value >= 10:
-            await self.hass.async_add_executor_job(
+            await self.coordinator.async_write_setting(
+                self.data.vin,
+                TARGET_TEMPERATURE,
+                float(value),
+                async_set_climatisation,
                 set_climatisation,
-                self.data.vin.value,
-                self.we_connect,
                 "none",
-                float(value)
             )
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""State adaptive polling for the Cupra Formentor integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CLIMATISATION_ON_STATES,
+    CONF_QUIET_HOURS_END,
+    CONF_QUIET_HOURS_START,
+    CONF_SCAN_INTERVAL,
+    CONF_SCAN_INTERVAL_ACTIVE,
+    CONF_SCAN_INTERVAL_IDLE,
+    CONF_SCAN_INTERVAL_QUIET,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL_ACTIVE,
+    DEFAULT_SCAN_INTERVAL_IDLE,
+    DEFAULT_SCAN_INTERVAL_QUIET,
+)
+from .snapshot import VehicleSnapshot
+
+
+@dataclass
+class PollDecision:
+    """Interval chosen for the next poll and why."""
+
+    mode: str
+    interval: timedelta
+    reason: str
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            "mode": self.mode,
+            "interval": int(self.interval.total_seconds()),
+            "reason": self.reason,
+        }
+
+
+class PollScheduler:
+    """Pick the next poll interval from the last known vehicle state."""
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        """Initialize the scheduler from the config entry options."""
+        self._intervals = {
+            "active": timedelta(
+                seconds=options.get(CONF_SCAN_INTERVAL_ACTIVE, DEFAULT_SCAN_INTERVAL_ACTIVE)
+            ),
+            "normal": timedelta(
+                seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+            ),
+            "idle": timedelta(
+                seconds=options.get(CONF_SCAN_INTERVAL_IDLE, DEFAULT_SCAN_INTERVAL_IDLE)
+            ),
+            "quiet": timedelta(
+                seconds=options.get(CONF_SCAN_INTERVAL_QUIET, DEFAULT_SCAN_INTERVAL_QUIET)
+            ),
+        }
+        self._quiet_start = _parse_time(options.get(CONF_QUIET_HOURS_START))
+        self._quiet_end = _parse_time(options.get(CONF_QUIET_HOURS_END))
+
+    @property
+    def default_interval(self) -> timedelta:
+        """Return the interval used before any vehicle state is known."""
+        return self._intervals["normal"]
+
+    def decide(
+        self,
+        snapshots: dict[str, VehicleSnapshot] | None,
+        now: datetime | None = None,
+    ) -> PollDecision:
+        """Return the interval for the next poll."""
+        if not snapshots:
+            return self._decision("normal", "no vehicle data yet")
+
+        for snapshot in snapshots.values():
+            charging_state = snapshot.value("charging", "chargingStatus", "chargingState")
+            if charging_state == "charging":
+                return self._decision("active", f"{snapshot.nickname} is charging")
+
+            climate_state = snapshot.value(
+                "climatisation", "climatisationStatus", "climatisationState"
+            )
+            if climate_state in CLIMATISATION_ON_STATES:
+                return self._decision(
+                    "active", f"{snapshot.nickname} climatisation is {climate_state}"
+                )
+
+        if self._in_quiet_hours(now or dt_util.now()):
+            return self._decision("quiet", "quiet hours")
+
+        if all(_is_idle(snapshot) for snapshot in snapshots.values()):
+            return self._decision("idle", "all vehicles unplugged or offline")
+
+        return self._decision("normal", "vehicle plugged in, not charging")
+
+    def _decision(self, mode: str, reason: str) -> PollDecision:
+        """Build a decision for a mode."""
+        return PollDecision(mode, self._intervals[mode], reason)
+
+    def _in_quiet_hours(self, now: datetime) -> bool:
+        """Return True if the local time falls in the configured quiet hours."""
+        if self._quiet_start is None or self._quiet_end is None:
+            return False
+
+        current = now.time()
+        if self._quiet_start <= self._quiet_end:
+            return self._quiet_start <= current < self._quiet_end
+        # Window wraps around midnight
+        return current >= self._quiet_start or current < self._quiet_end
+
+
+class PollStagger:
+    """Spread the polls of all accounts over the interval and cap concurrency.
+
+    Every account gets a slot at an even fraction of the interval, in
+    entry_id order. Each poll is nudged by at most half an interval so that
+    it lands on its slot, so accounts sharing an interval never poll in the
+    same second, and the semaphore limits how many updates run at once.
+    """
+
+    def __init__(self, max_concurrent: int) -> None:
+        """Initialize without any accounts."""
+        self._entry_ids: list[str] = []
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+
+    @callback
+    def async_register(self, entry_id: str) -> Callable[[], None]:
+        """Give an account a slot, return a callback releasing it."""
+        self._entry_ids = sorted({*self._entry_ids, entry_id})
+
+        @callback
+        def _release() -> None:
+            self._entry_ids = [other for other in self._entry_ids if other != entry_id]
+
+        return _release
+
+    def as_dict(self, entry_id: str) -> dict[str, Any]:
+        """Return a JSON serializable representation for one account."""
+        return {
+            "accounts": len(self._entry_ids),
+            "slot": self._entry_ids.index(entry_id)
+            if entry_id in self._entry_ids
+            else None,
+        }
+
+    def interval_for(
+        self, entry_id: str, interval: timedelta, now: datetime
+    ) -> timedelta:
+        """Return the interval that makes the next poll land on the slot."""
+        if len(self._entry_ids) < 2 or entry_id not in self._entry_ids:
+            return interval
+
+        period = interval.total_seconds()
+        slot = self._entry_ids.index(entry_id) / len(self._entry_ids) * period
+        due = now.timestamp() + period
+        shift = (slot - due) % period
+        if shift > period / 2:
+            shift -= period
+        return timedelta(seconds=period + shift)
+
+
+def _is_idle(snapshot: VehicleSnapshot) -> bool:
+    """Return True if nothing is expected to change on the vehicle soon."""
+    if snapshot.connection_state == "offline":
+        return True
+    plug_state = snapshot.value("charging", "plugStatus", "plugConnectionState")
+    return plug_state == "disconnected"
+
+
+def _parse_time(value: str | None) -> time | None:
+    """Parse an HH:MM[:SS] option value."""
+    if not value:
+        return None
+    return dt_util.parse_time(value)
@@ -1,30 +1,221 @@
 """Sensor platform for Cupra Formentor integration."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
 import logging
 from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
-    UnitOfElectricCurrent,
+    Platform,
+    UnitOfEnergy,
     UnitOfLength,
     UnitOfTemperature,
+    UnitOfTime,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 
-from . import CupraFormentorBaseEntity, get_object_value
-from .const import DOMAIN
+from . import CupraFormentorAccountEntity, CupraFormentorBaseEntity
+from .const import CLIMATISATION_ON_STATES, DOMAIN
+from .sessions import SESSION_STATUS
+from .snapshot import value_key
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class CupraSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading one field of a vehicle status."""
+
+    domain: str
+    status: str
+    value_fn: Callable[[Any], StateType] = lambda value: value
+
+
+AC_CURRENT_LABELS = {"maximum": "Máximo", "reduced": "Reducido"}
+
+# Values WeConnect reports for the text fields, states outside these are unknown
+CHARGING_STATES = [
+    "off",
+    "readyForCharging",
+    "notReadyForCharging",
+    "conservation",
+    "chargePurposeReachedAndNotConservationCharging",
+    "chargePurposeReachedAndConservation",
+    "charging",
+    "error",
+    "unsupported",
+    "discharging",
+]
+CHARGE_MODES = [
+    "manual",
+    "invalid",
+    "off",
+    "timer",
+    "onlyOwnCurrent",
+    "preferredChargingTimes",
+    "timerChargingWithClimatisation",
+    "homeStorageCharging",
+    "immediateDischarging",
+]
+CHARGE_TYPES = ["invalid", "off", "ac", "dc", "unsupported"]
+PLUG_CONNECTION_STATES = ["connected", "disconnected", "invalid", "unsupported"]
+PLUG_LOCK_STATES = ["locked", "unlocked", "invalid", "unsupported"]
+# WeConnect values plus "available", read as on by the external power sensor
+EXTERNAL_POWER_STATES = [
+    "available",
+    "ready",
+    "active",
+    "unavailable",
+    "invalid",
+    "unsupported",
+]
+CLIMATISATION_STATES = ["Encendido", "Apagado"]
+CONNECTION_STATES = ["En línea", "Fuera de línea", "Desconocido"]
+
+
+def _enum_value(options: list[str]) -> Callable[[Any], StateType]:
+    """Return a value_fn passing known options and mapping the rest to unknown."""
+    return lambda value: value if value in options else None
+
+
+CHARGING_SENSORS: tuple[CupraSensorEntityDescription, ...] = (
+    CupraSensorEntityDescription(
+        key="currentSOC_pct",
+        name="Estado de Carga",
+        domain="charging",
+        status="batteryStatus",
+        native_unit_of_measurement=PERCENTAGE,
+        device_class=SensorDeviceClass.BATTERY,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    CupraSensorEntityDescription(
+        key="cruisingRangeElectric_km",
+        name="Autonomía Eléctrica",
+        domain="charging",
+        status="batteryStatus",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+    ),
+    CupraSensorEntityDescription(
+        key="chargingState",
+        name="Estado de Carga",
+        domain="charging",
+        status="chargingStatus",
+        device_class=SensorDeviceClass.ENUM,
+        options=CHARGING_STATES,
+        value_fn=_enum_value(CHARGING_STATES),
+    ),
+    CupraSensorEntityDescription(
+        key="chargeMode",
+        name="Modo de Carga",
+        domain="charging",
+        status="chargingStatus",
+        device_class=SensorDeviceClass.ENUM,
+        options=CHARGE_MODES,
+        value_fn=_enum_value(CHARGE_MODES),
+    ),
+    CupraSensorEntityDescription(
+        key="chargeType",
+        name="Tipo de Carga",
+        domain="charging",
+        status="chargingStatus",
+        device_class=SensorDeviceClass.ENUM,
+        options=CHARGE_TYPES,
+        value_fn=_enum_value(CHARGE_TYPES),
+    ),
+    CupraSensorEntityDescription(
+        key="chargePower_kW",
+        name="Potencia de Carga",
+        domain="charging",
+        status="chargingStatus",
+        native_unit_of_measurement="kW",
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    CupraSensorEntityDescription(
+        key="plugConnectionState",
+        name="Estado del Enchufe",
+        domain="charging",
+        status="plugStatus",
+        device_class=SensorDeviceClass.ENUM,
+        options=PLUG_CONNECTION_STATES,
+        value_fn=_enum_value(PLUG_CONNECTION_STATES),
+    ),
+    CupraSensorEntityDescription(
+        key="plugLockState",
+        name="Bloqueo del Enchufe",
+        domain="charging",
+        status="plugStatus",
+        device_class=SensorDeviceClass.ENUM,
+        options=PLUG_LOCK_STATES,
+        value_fn=_enum_value(PLUG_LOCK_STATES),
+    ),
+    CupraSensorEntityDescription(
+        key="externalPower",
+        name="Energía Externa",
+        domain="charging",
+        status="plugStatus",
+        device_class=SensorDeviceClass.ENUM,
+        options=EXTERNAL_POWER_STATES,
+        value_fn=_enum_value(EXTERNAL_POWER_STATES),
+    ),
+)
+
+CHARGING_SETTING_SENSORS: tuple[CupraSensorEntityDescription, ...] = (
+    CupraSensorEntityDescription(
+        key="maxChargeCurrentAC",
+        name="Corriente Máxima AC",
+        domain="charging",
+        status="chargingSettings",
+        device_class=SensorDeviceClass.ENUM,
+        options=list(AC_CURRENT_LABELS.values()),
+        value_fn=lambda value: AC_CURRENT_LABELS.get(value),
+    ),
+    CupraSensorEntityDescription(
+        key="targetSOC_pct",
+        name="SOC Objetivo",
+        domain="charging",
+        status="chargingSettings",
+        native_unit_of_measurement=PERCENTAGE,
+    ),
+)
+
+CLIMATE_SENSORS: tuple[CupraSensorEntityDescription, ...] = (
+    CupraSensorEntityDescription(
+        key="climatisationState",
+        name="Estado Climatización",
+        domain="climatisation",
+        status="climatisationStatus",
+        device_class=SensorDeviceClass.ENUM,
+        options=CLIMATISATION_STATES,
+        value_fn=lambda value: "Encendido"
+        if value in CLIMATISATION_ON_STATES
+        else "Apagado",
+    ),
+    CupraSensorEntityDescription(
+        key="targetTemperature_C",
+        name="Temperatura Objetivo",
+        domain="climatisation",
+        status="climatisationSettings",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -35,337 +226,336 @@ async def async_setup_entry(
     coordinator = hass.data[DOMAIN][config_entry.entry_id + "_coordinator"]
 
     entities = []
+    entity_registry = er.async_get(hass)
 
     # Add sensors for each vehicle
-    for index, vehicle in enumerate(coordinator.data):
-        vin = vehicle.vin.value
-
-        # INFORMACIÓN DEL VEHÍCULO
-        entities.extend([
-            CupraVehicleInfoSensor(we_connect, coordinator, index, "vin", "VIN"),
-            CupraVehicleInfoSensor(we_connect, coordinator, index, "nickname", "Nombre"),
-            CupraVehicleInfoSensor(we_connect, coordinator, index, "model", "Modelo"),
-            CupraVehicleInfoSensor(we_connect, coordinator, index, "brand", "Marca"),
-        ])
-
-        # ESTADO ACTUAL DE CARGA
-        if hasattr(vehicle.domains, 'charging'):
-            charging_domain = vehicle.domains.charging
-            
-            # Battery status
-            if hasattr(charging_domain, 'batteryStatus'):
-                entities.extend([
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "currentSOC_pct", "Estado de Carga",
-                        PERCENTAGE, SensorDeviceClass.BATTERY
-                    ),
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "cruisingRangeElectric_km", "Autonomía Eléctrica",
-                        UnitOfLength.KILOMETERS, None
-                    ),
-                ])
-            
-            # Charging status
-            if hasattr(charging_domain, 'chargingStatus'):
-                entities.extend([
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "chargingState", "Estado de Carga",
-                        None, None
-                    ),
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "chargeMode", "Modo de Carga",
-                        None, None
-                    ),
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "chargeType", "Tipo de Carga",
-                        None, None
-                    ),
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "chargePower_kW", "Potencia de Carga",
-                        "kW", SensorDeviceClass.POWER
-                    ),
-                ])
-            
-            # Plug status
-            if hasattr(charging_domain, 'plugStatus'):
-                entities.extend([
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "plugConnectionState", "Estado del Enchufe",
-                        None, None
-                    ),
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "plugLockState", "Bloqueo del Enchufe",
-                        None, None
-                    ),
-                    CupraChargingSensor(
-                        we_connect, coordinator, index,
-                        "externalPower", "Energía Externa",
-                        None, None
-                    ),
-                ])
-
-        # CONFIGURACIÓN DE CARGA
-        if hasattr(vehicle.domains, 'charging') and hasattr(vehicle.domains.charging, 'chargingSettings'):
-            entities.extend([
-                CupraChargingSettingSensor(
-                    we_connect, coordinator, index,
-                    "maxChargeCurrentAC", "Corriente Máxima AC",
-                    UnitOfElectricCurrent.AMPERE, None
-                ),
-                CupraChargingSettingSensor(
-                    we_connect, coordinator, index,
-                    "targetSOC_pct", "SOC Objetivo",
-                    PERCENTAGE, None
-                ),
-            ])
-
-        # CLIMATIZACIÓN
-        if hasattr(vehicle.domains, 'climatisation'):
-            climatisation_domain = vehicle.domains.climatisation
-            
-            # Climate status
-            if hasattr(climatisation_domain, 'climatisationStatus'):
-                entities.append(
-                    CupraClimateSensor(
-                        we_connect, coordinator, index,
-                        "climatisationState", "Estado Climatización",
-                        None, None
-                    )
-                )
-            
-            # Climate settings
-            if hasattr(climatisation_domain, 'climatisationSettings'):
-                entities.append(
-                    CupraClimateSensor(
-                        we_connect, coordinator, index,
-                        "targetTemperature_C", "Temperatura Objetivo",
-                        UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE
-                    )
-                )
+    for vin, vehicle in coordinator.data.items():
+        # VIN, name, model and brand are part of the device, drop the old sensors
+        for attribute in ("vin", "nickname", "model", "brand"):
+            if entity_id := entity_registry.async_get_entity_id(
+                Platform.SENSOR, DOMAIN, f"{vin}_{attribute}"
+            ):
+                entity_registry.async_remove(entity_id)
+
+        # ESTADO DE CARGA, CONFIGURACIÓN DE CARGA Y CLIMATIZACIÓN
+        for sensor_class, descriptions in (
+            (CupraChargingSensor, CHARGING_SENSORS),
+            (CupraChargingSettingSensor, CHARGING_SETTING_SENSORS),
+            (CupraClimateSensor, CLIMATE_SENSORS),
+        ):
+            entities.extend(
+                sensor_class(we_connect, coordinator, vin, description)
+                for description in descriptions
+                if vehicle.has(description.domain, description.status)
+            )
+
+        # ENERGÍA CARGADA
+        if vehicle.has("charging", "chargingStatus"):
+            entities.append(CupraChargedEnergySensor(we_connect, coordinator, vin))
 
         # CONNECTION STATUS
         entities.append(
-            CupraConnectionSensor(we_connect, coordinator, index)
+            CupraConnectionSensor(we_connect, coordinator, vin)
         )
 
+    # ACCOUNT DIAGNOSTICS
+    entities.append(CupraPollIntervalSensor(coordinator))
+    entities.append(CupraRequestBudgetSensor(coordinator))
+    entities.extend(
+        CupraUpdateDurationSensor(coordinator, percent) for percent in (50, 95)
+    )
+    entities.append(CupraUpdateCyclesSensor(coordinator, succeeded=True))
+    entities.append(CupraUpdateCyclesSensor(coordinator, succeeded=False))
+    entities.append(CupraApiCallsSensor(coordinator))
+    entities.append(CupraDataAgeSensor(coordinator))
+
     async_add_entities(entities)
 
 
-class CupraVehicleInfoSensor(CupraFormentorBaseEntity, SensorEntity):
-    """Vehicle information sensors."""
+class CupraStatusSensor(CupraFormentorBaseEntity, SensorEntity):
+    """Sensor showing one status field, read through its description."""
+
+    entity_description: CupraSensorEntityDescription
+    _unique_id_prefix: str
 
     def __init__(
         self,
         we_connect,
         coordinator,
-        index,
-        attribute: str,
-        name: str,
+        vin,
+        description: CupraSensorEntityDescription,
     ) -> None:
-        """Initialize vehicle info sensor."""
-        super().__init__(we_connect, coordinator, index)
-        self._attribute = attribute
-        self._attr_name = f"{self.data.nickname} {name}"
-        self._attr_unique_id = f"{self.data.vin}_{attribute}"
+        """Initialize status sensor."""
+        super().__init__(we_connect, coordinator, vin)
+        self.entity_description = description
+        self._required_statuses = ((description.domain, description.status),)
+        # Resolved once so a state read is a single dict lookup
+        self._value_key = value_key(
+            description.domain, description.status, description.key
+        )
+        self._value_fn = description.value_fn
+        self._attr_name = f"{self.data.nickname} {description.name}"
+        self._attr_unique_id = (
+            f"{self.data.vin}_{self._unique_id_prefix}_{description.key}"
+        )
 
     @property
-    def state(self) -> Any:
-        """Return the state of the sensor."""
-        if self._attribute == "vin":
-            return self.data.vin.value
-        elif self._attribute == "nickname":
-            return self.data.nickname.value
-        elif self._attribute == "model":
-            return getattr(self.data.model, 'value', 'Unknown')
-        elif self._attribute == "brand":
-            # Try to get brand from specifications
-            if hasattr(self.data, 'specifications') and hasattr(self.data.specifications, 'salesType'):
-                return "CUPRA"
-            return "CUPRA"
-        return None
-
-
-class CupraChargingSensor(CupraFormentorBaseEntity, SensorEntity):
+    def native_value(self) -> StateType:
+        """Return the value of the sensor."""
+        return self._value_fn(self.data.values.get(self._value_key))
+
+
+class CupraChargingSensor(CupraStatusSensor):
     """Charging related sensors."""
 
-    def __init__(
-        self,
-        we_connect,
-        coordinator,
-        index,
-        attribute: str,
-        name: str,
-        unit: str | None,
-        device_class: SensorDeviceClass | None,
-    ) -> None:
-        """Initialize charging sensor."""
-        super().__init__(we_connect, coordinator, index)
-        self._attribute = attribute
-        self._attr_name = f"{self.data.nickname} {name}"
-        self._attr_unique_id = f"{self.data.vin}_charging_{attribute}"
-        self._attr_native_unit_of_measurement = unit
-        self._attr_device_class = device_class
-        
-        if unit and device_class in [SensorDeviceClass.BATTERY, SensorDeviceClass.POWER]:
-            self._attr_state_class = SensorStateClass.MEASUREMENT
+    _unique_id_prefix = "charging"
 
-    @property
-    def state(self) -> Any:
-        """Return the state of the sensor."""
-        try:
-            charging = self.data.domains.charging
-            
-            # Battery status attributes
-            if hasattr(charging, 'batteryStatus'):
-                battery = charging.batteryStatus
-                if self._attribute == "currentSOC_pct":
-                    return get_object_value(battery.currentSOC_pct)
-                elif self._attribute == "cruisingRangeElectric_km":
-                    return get_object_value(battery.cruisingRangeElectric_km)
-            
-            # Charging status attributes
-            if hasattr(charging, 'chargingStatus'):
-                status = charging.chargingStatus
-                if self._attribute == "chargingState":
-                    return get_object_value(status.chargingState)
-                elif self._attribute == "chargeMode":
-                    return get_object_value(status.chargeMode)
-                elif self._attribute == "chargeType":
-                    return get_object_value(status.chargeType)
-                elif self._attribute == "chargePower_kW":
-                    return get_object_value(status.chargePower_kW)
-            
-            # Plug status attributes
-            if hasattr(charging, 'plugStatus'):
-                plug = charging.plugStatus
-                if self._attribute == "plugConnectionState":
-                    return get_object_value(plug.plugConnectionState)
-                elif self._attribute == "plugLockState":
-                    return get_object_value(plug.plugLockState)
-                elif self._attribute == "externalPower":
-                    return get_object_value(plug.externalPower)
-                    
-        except Exception as e:
-            _LOGGER.debug("Error getting charging attribute %s: %s", self._attribute, e)
-            
-        return None
-
-
-class CupraChargingSettingSensor(CupraFormentorBaseEntity, SensorEntity):
+
+class CupraChargingSettingSensor(CupraStatusSensor):
     """Charging settings sensors."""
 
-    def __init__(
-        self,
-        we_connect,
-        coordinator,
-        index,
-        attribute: str,
-        name: str,
-        unit: str | None,
-        device_class: SensorDeviceClass | None,
-    ) -> None:
-        """Initialize charging setting sensor."""
-        super().__init__(we_connect, coordinator, index)
-        self._attribute = attribute
-        self._attr_name = f"{self.data.nickname} {name}"
-        self._attr_unique_id = f"{self.data.vin}_charging_setting_{attribute}"
-        self._attr_native_unit_of_measurement = unit
-        self._attr_device_class = device_class
+    _unique_id_prefix = "charging_setting"
 
-    @property
-    def state(self) -> Any:
-        """Return the state of the sensor."""
-        try:
-            settings = self.data.domains.charging.chargingSettings
-            
-            if self._attribute == "maxChargeCurrentAC":
-                value = get_object_value(settings.maxChargeCurrentAC)
-                # Convert to numeric if possible
-                if value == "maximum":
-                    return "Máximo"
-                elif value == "reduced":
-                    return "Reducido"
-                return value
-            elif self._attribute == "targetSOC_pct":
-                return get_object_value(settings.targetSOC_pct)
-                
-        except Exception as e:
-            _LOGGER.debug("Error getting charging setting %s: %s", self._attribute, e)
-            
-        return None
-
-
-class CupraClimateSensor(CupraFormentorBaseEntity, SensorEntity):
-    """Climate related sensors."""
 
-    def __init__(
-        self,
-        we_connect,
-        coordinator,
-        index,
-        attribute: str,
-        name: str,
-        unit: str | None,
-        device_class: SensorDeviceClass | None,
-    ) -> None:
-        """Initialize climate sensor."""
-        super().__init__(we_connect, coordinator, index)
-        self._attribute = attribute
-        self._attr_name = f"{self.data.nickname} {name}"
-        self._attr_unique_id = f"{self.data.vin}_climate_{attribute}"
-        self._attr_native_unit_of_measurement = unit
-        self._attr_device_class = device_class
-        
-        if device_class == SensorDeviceClass.TEMPERATURE:
-            self._attr_state_class = SensorStateClass.MEASUREMENT
+class CupraClimateSensor(CupraStatusSensor):
+    """Climate related sensors."""
 
-    @property
-    def state(self) -> Any:
-        """Return the state of the sensor."""
-        try:
-            climatisation = self.data.domains.climatisation
-            
-            if self._attribute == "climatisationState" and hasattr(climatisation, 'climatisationStatus'):
-                state = get_object_value(climatisation.climatisationStatus.climatisationState)
-                return "Encendido" if state == "on" else "Apagado"
-            elif self._attribute == "targetTemperature_C" and hasattr(climatisation, 'climatisationSettings'):
-                return get_object_value(climatisation.climatisationSettings.targetTemperature_C)
-                
-        except Exception as e:
-            _LOGGER.debug("Error getting climate attribute %s: %s", self._attribute, e)
-            
-        return None
+    _unique_id_prefix = "climate"
 
 
 class CupraConnectionSensor(CupraFormentorBaseEntity, SensorEntity):
     """Connection status sensor."""
 
-    def __init__(self, we_connect, coordinator, index) -> None:
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = CONNECTION_STATES
+
+    def __init__(self, we_connect, coordinator, vin) -> None:
         """Initialize connection sensor."""
-        super().__init__(we_connect, coordinator, index)
+        super().__init__(we_connect, coordinator, vin)
         self._attr_name = f"{self.data.nickname} Conexión"
         self._attr_unique_id = f"{self.data.vin}_connection"
 
     @property
-    def state(self) -> Any:
-        """Return the state of the sensor."""
-        try:
-            # Check if vehicle has connection status
-            if hasattr(self.data, 'status') and hasattr(self.data.status, 'connectionState'):
-                state = get_object_value(self.data.status.connectionState)
-                return "En línea" if state == "online" else "Fuera de línea"
-            # Alternative: check domains
-            elif hasattr(self.data, 'domains'):
-                return "En línea"
-        except Exception as e:
-            _LOGGER.debug("Error getting connection status: %s", e)
-            
-        return "Desconocido"
\ No newline at end of file
+    def native_value(self) -> str:
+        """Return the connection state of the vehicle."""
+        if self.data.connection_state is not None:
+            return "En línea" if self.data.connection_state == "online" else "Fuera de línea"
+        # Alternative: check domains
+        if self.data.capabilities:
+            return "En línea"
+
+        return "Desconocido"
+
+
+class CupraChargedEnergySensor(CupraFormentorBaseEntity, SensorEntity):
+    """Energy charged over all charging sessions, for the Energy dashboard."""
+
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_suggested_display_precision = 2
+    # The running session changes on every update, the log keeps it
+    _unrecorded_attributes = frozenset({"session"})
+    _required_statuses = (
+        ("charging", "batteryStatus"),
+        ("charging", "chargingStatus"),
+        ("charging", "plugStatus"),
+    )
+    # Energy grows during steady charging, when no status value changes
+    _notified_statuses = (SESSION_STATUS,)
+
+    def __init__(self, we_connect, coordinator, vin) -> None:
+        """Initialize charged energy sensor."""
+        super().__init__(we_connect, coordinator, vin)
+        self._attr_name = f"{self.data.nickname} Energía Cargada"
+        self._attr_unique_id = f"{self.data.vin}_charged_energy"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the total energy charged."""
+        tracker = self.coordinator.sessions.tracker(self.vin)
+        return round(tracker.total_kwh, 3) if tracker is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the running and the last finished session."""
+        tracker = self.coordinator.sessions.tracker(self.vin)
+        if tracker is None:
+            return {}
+        return {
+            "session": tracker.session.as_dict() if tracker.session else None,
+            "last_session": tracker.log[-1].as_dict() if tracker.log else None,
+        }
+
+
+class CupraPollIntervalSensor(CupraFormentorAccountEntity, SensorEntity):
+    """Current poll interval and the reason the scheduler picked it."""
+
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_icon = "mdi:timer-sync-outline"
+    # Per cycle details, only useful live
+    _unrecorded_attributes = frozenset(
+        {"skipped_cycles", "changed_fields", "unchanged_fields"}
+    )
+
+    def __init__(self, coordinator) -> None:
+        """Initialize poll interval sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Intervalo de Actualización"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_poll_interval"
+
+    @property
+    def native_value(self) -> int:
+        """Return the interval until the next poll."""
+        return int(self.coordinator.poll_decision.interval.total_seconds())
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return why this interval was chosen and what the last cycle changed."""
+        changes = self.coordinator.last_changes
+        return {
+            "mode": self.coordinator.poll_decision.mode,
+            "reason": self.coordinator.poll_decision.reason,
+            "skipped_cycles": self.coordinator.skipped_cycles,
+            "changed_fields": changes.changed if changes else None,
+            "unchanged_fields": changes.unchanged if changes else None,
+        }
+
+
+class CupraRequestBudgetSensor(CupraFormentorAccountEntity, SensorEntity):
+    """Requests the account may still send before polls are held back."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:speedometer"
+    _unrecorded_attributes = frozenset({"capacity", "refill_per_hour", "reserve"})
+
+    def __init__(self, coordinator) -> None:
+        """Initialize request budget sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Presupuesto de Peticiones"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_request_budget"
+
+    @property
+    def native_value(self) -> int:
+        """Return the remaining request budget."""
+        return int(self.coordinator.budget.remaining)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the budget limits and any throttling backoff."""
+        attributes = self.coordinator.budget.as_dict()
+        attributes.pop("remaining")
+        return attributes
+
+
+class CupraHealthSensor(CupraFormentorAccountEntity, SensorEntity):
+    """Account health figure, kept available while updates fail."""
+
+    @property
+    def available(self) -> bool:
+        """Return True, failing updates are what these sensors report."""
+        return True
+
+
+class CupraUpdateDurationSensor(CupraHealthSensor):
+    """Percentile duration of the recent update cycles."""
+
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+    _attr_icon = "mdi:timer-outline"
+    _unrecorded_attributes = frozenset({"cycles"})
+
+    def __init__(self, coordinator, percent: int) -> None:
+        """Initialize update duration sensor."""
+        super().__init__(coordinator)
+        self._percent = percent
+        self._attr_name = (
+            f"{coordinator.entry.title} Duración de Actualización p{percent}"
+        )
+        self._attr_unique_id = (
+            f"{coordinator.entry.entry_id}_update_duration_p{percent}"
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the duration percentile over the kept cycles."""
+        return self.coordinator.cycles.duration_percentile(self._percent)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return how many cycles the percentile covers."""
+        cycles = self.coordinator.cycles
+        return {
+            "cycles": sum(1 for cycle in cycles if cycle.succeeded or cycle.failed)
+        }
+
+
+class CupraUpdateCyclesSensor(CupraHealthSensor):
+    """Successful or failed update cycles since setup."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator, succeeded: bool) -> None:
+        """Initialize update cycles sensor."""
+        super().__init__(coordinator)
+        self._succeeded = succeeded
+        kind = "successful" if succeeded else "failed"
+        name = "Ciclos Correctos" if succeeded else "Ciclos Fallidos"
+        self._attr_name = f"{coordinator.entry.title} {name}"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_{kind}_cycles"
+        self._attr_icon = (
+            "mdi:check-circle-outline" if succeeded else "mdi:alert-circle-outline"
+        )
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of cycles."""
+        cycles = self.coordinator.cycles
+        return cycles.succeeded if self._succeeded else cycles.failed
+
+
+class CupraApiCallsSensor(CupraHealthSensor):
+    """Requests the account sent to the backend during the last hour."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "llamadas/h"
+    _attr_icon = "mdi:api"
+
+    def __init__(self, coordinator) -> None:
+        """Initialize API calls sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Llamadas API por Hora"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_api_calls_per_hour"
+
+    @property
+    def native_value(self) -> int:
+        """Return the requests of the last hour."""
+        return self.coordinator.meter.per_hour()
+
+
+class CupraDataAgeSensor(CupraHealthSensor):
+    """When the newest vehicle data of the account was reported."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:clock-check-outline"
+
+    def __init__(self, coordinator) -> None:
+        """Initialize data age sensor."""
+        super().__init__(coordinator)
+        self._attr_name = f"{coordinator.entry.title} Datos Más Recientes"
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_newest_data"
+
+    @property
+    def native_value(self) -> datetime | None:
+        """Return the update time of the most recently updated vehicle."""
+        return max(
+            (
+                snapshot.updated_at
+                for snapshot in (self.coordinator.data or {}).values()
+                if snapshot.updated_at is not None
+            ),
+            default=None,
+        )
@@ -0,0 +1,243 @@
+"""Charging session tracking for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_BATTERY_CAPACITY, SESSION_LOG_SIZE, SESSION_MAX_GAP
+from .snapshot import VehicleSnapshot
+from .store import CupraSessionStore
+
+_LOGGER = logging.getLogger(__name__)
+
+CHARGING_STATE = ("charging", "chargingStatus", "chargingState")
+CHARGE_POWER = ("charging", "chargingStatus", "chargePower_kW")
+PLUG_STATE = ("charging", "plugStatus", "plugConnectionState")
+SOC = ("charging", "batteryStatus", "currentSOC_pct")
+
+# Pseudo (domain, status) pair reported as changed when a tracker sampled
+# new values, its energy can grow while the status values stay the same
+SESSION_STATUS = ("sessions", "tracker")
+
+
+@dataclass
+class ChargingSession:
+    """A plug-in to unplug session and the energy charged during it."""
+
+    started_at: float
+    start_soc: float | None
+    energy_kwh: float = 0.0
+    ended_at: float | None = None
+    end_soc: float | None = None
+    # Energy estimated from the SOC change over gaps between sparse samples
+    soc_estimated_kwh: float = 0.0
+
+    def as_list(self) -> list[Any]:
+        """Return the compact form kept in the session log."""
+        return [
+            self.started_at,
+            self.ended_at,
+            self.start_soc,
+            self.end_soc,
+            round(self.energy_kwh, 3),
+            round(self.soc_estimated_kwh, 3),
+        ]
+
+    @classmethod
+    def from_list(cls, data: list[Any]) -> ChargingSession:
+        """Restore a session kept with as_list."""
+        started_at, ended_at, start_soc, end_soc, energy, estimated = data
+        return cls(started_at, start_soc, energy, ended_at, end_soc, estimated)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            "started_at": dt_util.utc_from_timestamp(self.started_at).isoformat(),
+            "ended_at": dt_util.utc_from_timestamp(self.ended_at).isoformat()
+            if self.ended_at is not None
+            else None,
+            "start_soc": self.start_soc,
+            "end_soc": self.end_soc,
+            "energy_kwh": round(self.energy_kwh, 3),
+            "soc_estimated_kwh": round(self.soc_estimated_kwh, 3),
+        }
+
+
+class VehicleChargingTracker:
+    """Detect charging sessions of one vehicle and integrate their energy.
+
+    A session starts when the vehicle starts charging and ends when it is
+    unplugged, or stops charging if it reports no plug state. Between two
+    samples taken while charging, energy is integrated from the charge power
+    with the trapezoid rule. Samples further apart than SESSION_MAX_GAP miss
+    too much of the power curve, so the energy of such a gap is estimated
+    from the SOC change instead, at the kWh per percent learned from densely
+    sampled stretches.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without any charged energy."""
+        self.total_kwh = 0.0
+        self.session: ChargingSession | None = None
+        self.log: list[ChargingSession] = []
+        # (timestamp, charging, power, soc) of the last sample
+        self._last: tuple[float, bool, float, float | None] | None = None
+        # Energy and SOC gained over densely sampled stretches
+        self._dense_kwh = 0.0
+        self._dense_soc = 0.0
+
+    @property
+    def kwh_per_percent(self) -> float:
+        """Return the energy one percent of SOC takes."""
+        if self._dense_soc >= 5:
+            return self._dense_kwh / self._dense_soc
+        return DEFAULT_BATTERY_CAPACITY / 100
+
+    def sample(self, snapshot: VehicleSnapshot) -> bool:
+        """Add the values of an update, return True if anything changed."""
+        if snapshot.updated_at is None:
+            return False
+        timestamp = snapshot.updated_at.timestamp()
+        if self._last is not None and timestamp <= self._last[0]:
+            return False
+
+        charging = snapshot.value(*CHARGING_STATE) == "charging"
+        power = _number(snapshot.value(*CHARGE_POWER)) or 0.0
+        soc = _number(snapshot.value(*SOC))
+        plug = snapshot.value(*PLUG_STATE)
+        previous, self._last = self._last, (timestamp, charging, power, soc)
+
+        if self.session is None and charging:
+            self.session = ChargingSession(timestamp, soc)
+            _LOGGER.debug("Charging session of %s started", snapshot.vin)
+        elif self.session is not None and previous is not None and previous[1]:
+            self._integrate(previous, self._last)
+
+        if self.session is not None and (
+            plug == "disconnected" or (plug is None and not charging)
+        ):
+            self._end_session(timestamp, soc)
+            _LOGGER.debug("Charging session of %s ended", snapshot.vin)
+        return True
+
+    def _integrate(
+        self,
+        previous: tuple[float, bool, float, float | None],
+        current: tuple[float, bool, float, float | None],
+    ) -> None:
+        """Add the energy charged between two samples, the first one charging."""
+        hours = (current[0] - previous[0]) / 3600
+        soc_gain = (
+            max(current[3] - previous[3], 0.0)
+            if current[3] is not None and previous[3] is not None
+            else None
+        )
+        if current[0] - previous[0] <= SESSION_MAX_GAP:
+            energy = (previous[2] + current[2]) / 2 * hours
+            if soc_gain is not None:
+                self._dense_kwh += energy
+                self._dense_soc += soc_gain
+        elif soc_gain is not None:
+            energy = soc_gain * self.kwh_per_percent
+            self.session.soc_estimated_kwh += energy
+        else:
+            # Nothing to estimate from, assume the last power held
+            energy = previous[2] * hours
+
+        self.session.energy_kwh += energy
+        self.total_kwh += energy
+
+    def _end_session(self, timestamp: float, soc: float | None) -> None:
+        """Close the running session and add it to the log."""
+        self.session.ended_at = timestamp
+        self.session.end_soc = soc
+        self.log = [*self.log, self.session][-SESSION_LOG_SIZE:]
+        self.session = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state to persist."""
+        return {
+            "total_kwh": self.total_kwh,
+            "dense": [self._dense_kwh, self._dense_soc],
+            "last": list(self._last) if self._last is not None else None,
+            "session": self.session.as_list() if self.session else None,
+            "log": [session.as_list() for session in self.log],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> VehicleChargingTracker:
+        """Restore a tracker persisted with as_dict."""
+        tracker = cls()
+        tracker.total_kwh = data["total_kwh"]
+        tracker._dense_kwh, tracker._dense_soc = data["dense"]
+        if data["last"] is not None:
+            tracker._last = tuple(data["last"])
+        if data["session"] is not None:
+            tracker.session = ChargingSession.from_list(data["session"])
+        tracker.log = [ChargingSession.from_list(item) for item in data["log"]]
+        return tracker
+
+
+class ChargingSessions:
+    """Charging trackers of the vehicles of one account, persisted together."""
+
+    def __init__(self, store: CupraSessionStore) -> None:
+        """Initialize without trackers."""
+        self._store = store
+        self._trackers: dict[str, VehicleChargingTracker] = {}
+
+    async def async_load(self) -> None:
+        """Restore the trackers stored before the last shutdown."""
+        data = await self._store.async_load()
+        for vin, stored in data.get("vehicles", {}).items():
+            try:
+                self._trackers[vin] = VehicleChargingTracker.from_dict(stored)
+            except (KeyError, TypeError, ValueError) as exc:
+                _LOGGER.debug("Ignoring stored charging sessions of %s: %s", vin, exc)
+
+    def tracker(self, vin: str) -> VehicleChargingTracker | None:
+        """Return the tracker of a vehicle, if it was ever sampled."""
+        return self._trackers.get(vin)
+
+    @callback
+    def async_sample(
+        self,
+        snapshots: dict[str, VehicleSnapshot],
+        domains: Iterable[str] | None,
+    ) -> set[str]:
+        """Feed the vehicle values of an update to the trackers.
+
+        Returns the VINs whose tracker changed.
+        """
+        if domains is not None and "charging" not in domains:
+            # Values were carried over from an earlier update, not sampled now
+            return set()
+
+        changed: set[str] = set()
+        for vin, snapshot in snapshots.items():
+            if not snapshot.has("charging", "chargingStatus"):
+                continue
+            tracker = self._trackers.setdefault(vin, VehicleChargingTracker())
+            if tracker.sample(snapshot):
+                changed.add(vin)
+        if changed:
+            self._store.async_schedule_save(
+                lambda: {
+                    "vehicles": {
+                        vin: tracker.as_dict() for vin, tracker in self._trackers.items()
+                    }
+                }
+            )
+        return changed
+
+
+def _number(value: Any) -> float | None:
+    """Return a numeric vehicle value as float, None if it is not numeric."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
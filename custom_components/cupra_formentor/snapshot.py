@@ -0,0 +1,283 @@
+"""Vehicle snapshots for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Status fields the integration reads, per domain and status
+TRACKED_FIELDS: dict[str, dict[str, tuple[str, ...]]] = {
+    "charging": {
+        "batteryStatus": ("currentSOC_pct", "cruisingRangeElectric_km"),
+        "chargingStatus": (
+            "chargingState",
+            "chargeMode",
+            "chargeType",
+            "chargePower_kW",
+        ),
+        "plugStatus": ("plugConnectionState", "plugLockState", "externalPower"),
+        "chargingSettings": ("maxChargeCurrentAC", "targetSOC_pct"),
+    },
+    "climatisation": {
+        "climatisationStatus": ("climatisationState",),
+        "climatisationSettings": ("targetTemperature_C",),
+    },
+}
+
+
+def get_object_value(value) -> str:
+    """Get value from object or enum."""
+
+    while hasattr(value, "value"):
+        value = value.value
+
+    return value
+
+
+def status_of(domain: str, name: str) -> str | None:
+    """Return the status a tracked field belongs to."""
+    for status, names in TRACKED_FIELDS.get(domain, {}).items():
+        if name in names:
+            return status
+    return None
+
+
+def value_key(domain: str, status: str, name: str) -> str:
+    """Return the flat key a status field is stored under."""
+    return f"{domain}.{status}.{name}"
+
+
+@dataclass
+class VehicleSnapshot:
+    """Plain, storable copy of what the integration knows about a vehicle."""
+
+    vin: str
+    nickname: str
+    model: str
+    capabilities: dict[str, list[str]] = field(default_factory=dict)
+    values: dict[str, Any] = field(default_factory=dict)
+    connection_state: str | None = None
+    updated_at: datetime | None = None
+
+    def has(self, domain: str, status: str | None = None) -> bool:
+        """Return True if the vehicle offers the domain (and status)."""
+        if domain not in self.capabilities:
+            return False
+        return status is None or status in self.capabilities[domain]
+
+    def value(self, domain: str, status: str, name: str) -> Any:
+        """Return the last known value of a status field."""
+        return self.values.get(value_key(domain, status, name))
+
+    @classmethod
+    def from_vehicle(
+        cls,
+        vehicle,
+        domains: Iterable[str] | None = None,
+        previous: VehicleSnapshot | None = None,
+    ) -> VehicleSnapshot:
+        """Build a snapshot from a WeConnect vehicle object.
+
+        Only the given domains are read from the vehicle; the others are
+        carried over from the previous snapshot.
+        """
+        fetched = set(TRACKED_FIELDS if domains is None else domains)
+        capabilities, values = _carry_over(previous, fetched)
+
+        live_domains = getattr(vehicle, "domains", None) or {}
+        for domain, statuses in TRACKED_FIELDS.items():
+            if domain not in fetched:
+                continue
+
+            live_domain = live_domains.get(domain)
+            if not live_domain:
+                continue
+
+            capabilities[domain] = []
+            for status, names in statuses.items():
+                live_status = live_domain.get(status)
+                if live_status is None:
+                    continue
+
+                capabilities[domain].append(status)
+                for name in names:
+                    attribute = getattr(live_status, name, None)
+                    if attribute is None or not getattr(attribute, "enabled", True):
+                        continue
+                    values[value_key(domain, status, name)] = get_object_value(
+                        attribute
+                    )
+
+        connection_state = None
+        status = getattr(vehicle, "status", None)
+        if status is not None and hasattr(status, "connectionState"):
+            connection_state = get_object_value(status.connectionState)
+
+        return cls(
+            vin=get_object_value(vehicle.vin),
+            nickname=get_object_value(vehicle.nickname),
+            model=getattr(vehicle.model, "value", None) or "Unknown",
+            capabilities=capabilities,
+            values=values,
+            connection_state=connection_state,
+            updated_at=dt_util.utcnow(),
+        )
+
+    @classmethod
+    def from_api(
+        cls,
+        vehicle: dict[str, Any],
+        status: dict[str, Any],
+        domains: Iterable[str],
+        previous: VehicleSnapshot | None = None,
+    ) -> VehicleSnapshot:
+        """Build a snapshot from the JSON of the vehicle list and its status."""
+        fetched = set(domains)
+        capabilities, values = _carry_over(previous, fetched)
+
+        for domain, statuses in TRACKED_FIELDS.items():
+            live_domain = status.get(domain)
+            if domain not in fetched or not isinstance(live_domain, dict):
+                continue
+
+            capabilities[domain] = []
+            for status_name, names in statuses.items():
+                live_status = live_domain.get(status_name)
+                if not isinstance(live_status, dict) or "value" not in live_status:
+                    continue
+
+                capabilities[domain].append(status_name)
+                for name in names:
+                    if name in live_status["value"]:
+                        values[value_key(domain, status_name, name)] = live_status[
+                            "value"
+                        ][name]
+
+        return cls(
+            vin=vehicle["vin"],
+            nickname=vehicle.get("nickname") or vehicle["vin"],
+            model=vehicle.get("model") or "Unknown",
+            capabilities=capabilities,
+            values=values,
+            connection_state=previous.connection_state if previous else None,
+            updated_at=dt_util.utcnow(),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            "vin": self.vin,
+            "nickname": self.nickname,
+            "model": self.model,
+            "capabilities": self.capabilities,
+            "values": dict(self.values),
+            "connection_state": self.connection_state,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> VehicleSnapshot:
+        """Restore a snapshot stored with as_dict."""
+        updated_at = data.get("updated_at")
+        return cls(
+            vin=data["vin"],
+            nickname=data["nickname"],
+            model=data["model"],
+            capabilities=data.get("capabilities", {}),
+            values=data.get("values", {}),
+            connection_state=data.get("connection_state"),
+            updated_at=dt_util.parse_datetime(updated_at) if updated_at else None,
+        )
+
+
+def _carry_over(
+    previous: VehicleSnapshot | None, fetched: set[str]
+) -> tuple[dict[str, list[str]], dict[str, Any]]:
+    """Return capabilities and values of the domains that were not fetched."""
+    capabilities: dict[str, list[str]] = {}
+    values: dict[str, Any] = {}
+    if previous is None:
+        return capabilities, values
+
+    for domain in set(previous.capabilities) - fetched:
+        capabilities[domain] = previous.capabilities[domain]
+        values.update(
+            (key, value)
+            for key, value in previous.values.items()
+            if key.startswith(f"{domain}.")
+        )
+    return capabilities, values
+
+
+def snapshots_from_vehicles(
+    vehicles,
+    domains: Iterable[str] | None = None,
+    previous: dict[str, VehicleSnapshot] | None = None,
+) -> dict[str, VehicleSnapshot]:
+    """Build snapshots for all vehicles of an account, keyed by VIN."""
+    previous = previous or {}
+    snapshots = {}
+    for vin, vehicle in sorted(vehicles.items()):
+        try:
+            snapshots[vin] = VehicleSnapshot.from_vehicle(
+                vehicle, domains, previous.get(vin)
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.warning("Could not read vehicle %s: %s", vin, exc)
+    return snapshots
+
+
+# Snapshot attributes besides the status values that entities display
+_VEHICLE_FIELDS = ("nickname", "model", "connection_state", "capabilities")
+
+
+@dataclass
+class SnapshotChanges:
+    """What differs between two sets of snapshots of an account."""
+
+    # Per VIN, the (domain, status) pairs holding a changed value
+    statuses: dict[str, set[tuple[str, str]]] = field(default_factory=dict)
+    # VINs that appeared, disappeared or changed outside their status values
+    vehicles: set[str] = field(default_factory=set)
+    changed: int = 0
+    unchanged: int = 0
+
+    def affects(self, vin: str, statuses: Iterable[tuple[str, str]]) -> bool:
+        """Return True if an entity reading these statuses must be updated."""
+        if vin in self.vehicles:
+            return True
+        changed = self.statuses.get(vin)
+        return bool(changed) and not changed.isdisjoint(statuses)
+
+
+def diff_snapshots(
+    previous: dict[str, VehicleSnapshot], current: dict[str, VehicleSnapshot]
+) -> SnapshotChanges:
+    """Compare two sets of snapshots field by field."""
+    changes = SnapshotChanges()
+    changes.vehicles.update(previous.keys() ^ current.keys())
+
+    for vin in previous.keys() & current.keys():
+        old, new = previous[vin], current[vin]
+        for name in _VEHICLE_FIELDS:
+            if getattr(old, name) != getattr(new, name):
+                changes.vehicles.add(vin)
+                changes.changed += 1
+            else:
+                changes.unchanged += 1
+
+        for key in old.values.keys() | new.values.keys():
+            if old.values.get(key) == new.values.get(key):
+                changes.unchanged += 1
+                continue
+            changes.changed += 1
+            domain, status, _ = key.split(".", 2)
+            changes.statuses.setdefault(vin, set()).add((domain, status))
+
+    return changes
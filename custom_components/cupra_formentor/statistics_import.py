@@ -0,0 +1,160 @@
+"""Long-term statistics import for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+import logging
+from statistics import fmean
+from typing import Any
+
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+)
+from homeassistant.const import PERCENTAGE, UnitOfLength, UnitOfPower
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .snapshot import VehicleSnapshot, value_key
+from .store import CupraSampleStore
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:
+    # Before HA 2025.6 statistics only have has_mean
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sampled fields: statistic suffix -> (domain, status, field), unit, name
+SAMPLED_FIELDS: dict[str, tuple[tuple[str, str, str], str, str]] = {
+    "soc": (
+        ("charging", "batteryStatus", "currentSOC_pct"),
+        PERCENTAGE,
+        "Estado de Carga",
+    ),
+    "charge_power": (
+        ("charging", "chargingStatus", "chargePower_kW"),
+        UnitOfPower.KILO_WATT,
+        "Potencia de Carga",
+    ),
+    "range": (
+        ("charging", "batteryStatus", "cruisingRangeElectric_km"),
+        UnitOfLength.KILOMETERS,
+        "Autonomía Eléctrica",
+    ),
+}
+
+
+def statistic_id(vin: str, suffix: str) -> str:
+    """Return the external statistic id of a sampled field of a vehicle."""
+    return f"{DOMAIN}:{vin.lower()}_{suffix}"
+
+
+class VehicleStatistics:
+    """Sample vehicle values and import them as hourly long-term statistics.
+
+    Every update that fetched the charging domain adds a sample per field.
+    Samples are kept, and persisted, until their hour has passed; then each
+    completed hour is imported with its mean, min and max in one batch per
+    statistic, without a recorder state write per sample. Samples survive a
+    restart, so hours sampled before downtime are still imported after it.
+    """
+
+    def __init__(self, hass: HomeAssistant, store: CupraSampleStore) -> None:
+        """Initialize without samples."""
+        self._hass = hass
+        self._store = store
+        # statistic_id -> [[timestamp, value], ...], oldest first
+        self._samples: dict[str, list[list[float]]] = {}
+        # statistic_id -> timestamp of the end of the last imported hour
+        self._imported_until: dict[str, float] = {}
+        self._names: dict[str, str] = {}
+
+    async def async_load(self) -> None:
+        """Restore the samples not imported before the last shutdown."""
+        data = await self._store.async_load()
+        self._samples = data.get("samples", {})
+        self._imported_until = data.get("imported_until", {})
+
+    @callback
+    def async_sample(
+        self,
+        snapshots: dict[str, VehicleSnapshot],
+        domains: Iterable[str] | None,
+    ) -> None:
+        """Add the values of an update, and import the hours that completed."""
+        if domains is not None and "charging" not in domains:
+            # Values were carried over from an earlier update, not sampled now
+            return
+
+        for vin, snapshot in snapshots.items():
+            if snapshot.updated_at is None:
+                continue
+            timestamp = snapshot.updated_at.timestamp()
+            for suffix, (field, _, name) in SAMPLED_FIELDS.items():
+                value = snapshot.values.get(value_key(*field))
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                key = statistic_id(vin, suffix)
+                self._names[key] = f"{snapshot.nickname} {name}"
+                series = self._samples.setdefault(key, [])
+                if series and series[-1][0] >= timestamp:
+                    continue
+                if timestamp < self._imported_until.get(key, 0):
+                    continue
+                series.append([timestamp, float(value)])
+
+        self._async_import_completed(dt_util.utcnow())
+        self._store.async_schedule_save(self._as_dict)
+
+    @callback
+    def _async_import_completed(self, now: datetime) -> None:
+        """Import the samples of every hour that has passed."""
+        if "recorder" not in self._hass.config.components:
+            # Keep the samples until the recorder runs
+            return
+
+        current_hour = now.replace(minute=0, second=0, microsecond=0).timestamp()
+        for key, series in self._samples.items():
+            completed = [sample for sample in series if sample[0] < current_hour]
+            if not completed:
+                continue
+
+            hours: dict[float, list[float]] = {}
+            for timestamp, value in completed:
+                hours.setdefault(timestamp - timestamp % 3600, []).append(value)
+            statistics = [
+                {
+                    "start": dt_util.utc_from_timestamp(start),
+                    "mean": fmean(values),
+                    "min": min(values),
+                    "max": max(values),
+                }
+                for start, values in sorted(hours.items())
+            ]
+            async_add_external_statistics(self._hass, self._metadata(key), statistics)
+            _LOGGER.debug("Imported %s hours of %s", len(statistics), key)
+
+            series[: len(completed)] = []
+            self._imported_until[key] = max(hours) + 3600
+
+    def _metadata(self, key: str) -> dict[str, Any]:
+        """Return the statistic metadata of a sampled field."""
+        suffix = next(suffix for suffix in SAMPLED_FIELDS if key.endswith(f"_{suffix}"))
+        _, unit, name = SAMPLED_FIELDS[suffix]
+        metadata: dict[str, Any] = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": self._names.get(key, name),
+            "source": DOMAIN,
+            "statistic_id": key,
+            "unit_of_measurement": unit,
+        }
+        if StatisticMeanType is not None:
+            metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+        return metadata
+
+    def _as_dict(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"samples": self._samples, "imported_until": self._imported_until}
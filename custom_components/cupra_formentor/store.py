@@ -0,0 +1,132 @@
+"""Persistent storage helpers for the Cupra Formentor integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, STORAGE_VERSION
+from .snapshot import VehicleSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CupraTokenStore:
+    """Keep the WeConnect session tokens of one config entry in HA storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the token store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.tokens", private=True
+        )
+        self._tokens: dict[str, Any] | None = None
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Return the stored tokens, or None when nothing usable is stored."""
+        data = await self._store.async_load()
+        if not data or not isinstance(data.get("tokens"), dict):
+            return None
+
+        self._tokens = data["tokens"]
+        return self._tokens
+
+    async def async_save(self, tokens: dict[str, Any] | None) -> None:
+        """Store the tokens if they changed since the last save."""
+        if not tokens or tokens == self._tokens:
+            return
+
+        self._tokens = tokens
+        await self._store.async_save({"tokens": tokens})
+        _LOGGER.debug("Stored refreshed WeConnect tokens")
+
+    async def async_remove(self) -> None:
+        """Forget the stored tokens."""
+        self._tokens = None
+        await self._store.async_remove()
+
+
+class CupraSnapshotStore:
+    """Keep the last known vehicle snapshots of one config entry in HA storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.vehicles"
+        )
+
+    async def async_load(self) -> dict[str, VehicleSnapshot]:
+        """Return the stored snapshots, keyed by VIN."""
+        data = await self._store.async_load()
+        if not data:
+            return {}
+
+        snapshots = {}
+        for vin, stored in sorted(data.get("vehicles", {}).items()):
+            try:
+                snapshots[vin] = VehicleSnapshot.from_dict(stored)
+            except (KeyError, TypeError, ValueError) as exc:
+                _LOGGER.debug("Ignoring stored snapshot for %s: %s", vin, exc)
+        return snapshots
+
+    @callback
+    def async_schedule_save(self, snapshots: dict[str, VehicleSnapshot]) -> None:
+        """Store the snapshots, batching frequent updates into one write."""
+        self._store.async_delay_save(
+            lambda: {
+                "vehicles": {vin: snapshot.as_dict() for vin, snapshot in snapshots.items()}
+            },
+            SNAPSHOT_SAVE_DELAY,
+        )
+
+    async def async_remove(self) -> None:
+        """Forget the stored snapshots."""
+        await self._store.async_remove()
+
+
+class CupraSampleStore:
+    """Keep the sampled values not yet imported as statistics in HA storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the sample store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.samples"
+        )
+
+    async def async_load(self) -> dict[str, Any]:
+        """Return the stored samples and import progress."""
+        return await self._store.async_load() or {}
+
+    @callback
+    def async_schedule_save(self, data: Callable[[], dict[str, Any]]) -> None:
+        """Store the samples, batching frequent updates into one write."""
+        self._store.async_delay_save(data, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Forget the stored samples."""
+        await self._store.async_remove()
+
+
+class CupraSessionStore:
+    """Keep the charging sessions and energy totals of one config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the session store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.sessions"
+        )
+
+    async def async_load(self) -> dict[str, Any]:
+        """Return the stored trackers, keyed by VIN."""
+        return await self._store.async_load() or {}
+
+    @callback
+    def async_schedule_save(self, data: Callable[[], dict[str, Any]]) -> None:
+        """Store the trackers, batching frequent updates into one write."""
+        self._store.async_delay_save(data, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Forget the stored sessions."""
+        await self._store.async_remove()